@@ -1,93 +1,74 @@
 import math
+import threading
 import numpy as np
-from scipy.integrate import quad
-from scipy.optimize import fsolve
+from collections import OrderedDict
+from scipy.interpolate import PchipInterpolator
 
-from copy import deepcopy as dc
 
-class StateDataForPlotting:
+def conversionFactors(SI=True, mass=False, total=False, n=1.0, MW=1.0, Units=None):
     """
-    I'm making this class for easy storage of data for plotting.
+    The factors that take molar metric state data (K, Pa, J/mol, J/mol*K, m^3/mol) to the requested units.
+    :param SI: metric (True) or english (False) units
+    :param mass: per unit mass
+    :param total: extensive values for n moles (ignored if mass is True)
+    :param n: number of moles
+    :param MW: molecular weight
+    :param Units: a units object (only its conversion factors are used)
+    :return: dictionary of conversion factors keyed by T, P, h, u, s, v
     """
-    def __init__(self):
-        self.T = []
-        self.P = []
-        self.h = []
-        self.u = []
-        self.s = []
-        self.v = []
-
-    def clear(self):
-        self.T.clear()
-        self.P.clear()
-        self.h.clear()
-        self.u.clear()
-        self.s.clear()
-        self.v.clear()
-
-    def add(self, vals):
-        T, P, u, h, s, v = vals
-        self.T.append(T)
-        self.P.append(P)
-        self.h.append(h)
-        self.u.append(u)
-        self.s.append(s)
-        self.v.append(v)
-
-    def getAxisLabel(self, W='T', Units=None):
-        Units = Units if Units is not None else units()
-        w=W.lower()
-        if w == 't':
-            return Units.TPlotUnits
-        if w == 'h':
-            return Units.hPlotUnits
-        if w == 'u':
-            return Units.uPlotUnits
-        if w == 's':
-            return Units.sPlotUnits
-        if w == 'v':
-            return Units.vPlotUnits
-        if w == 'p':
-            return Units.PPlotUnits
-
-    def getDataCol(self, W='T'):
-        w=W.lower()
-        if w=='t':
-            return self.T
-        if w=='h':
-            return self.h
-        if w=='u':
-            return self.u
-        if w=='s':
-            return self.s
-        if w=='v':
-            return self.v
-        if w=='p':
-            return self.P
+    UC=Units if Units is not None else units()
+    TCF = 1.0 if SI else UC.CF_T
+    PCF = 1.0 if SI else UC.CF_P
+    vCF = 1.0 if SI else UC.CF_v  # convert m^3/mol to ft^3/lbmol
+    uCF = 1.0 if SI else UC.CF_e  # cpmvert J/mol to Btu/lbmol
+    hCF = 1.0 if SI else UC.CF_e
+    sCF = 1.0 if SI else UC.CF_s
+    nCF = 1.0 if SI else UC.CF_n  # convert mol to lbmol
+    if mass:
+        vCF/=MW
+        uCF/=MW
+        hCF/=MW
+        sCF/=MW
+    elif total:
+        vCF*=n*nCF
+        uCF*=n*nCF
+        hCF*=n*nCF
+        sCF*=n*nCF
+    return {'T': TCF, 'P': PCF, 'h': hCF, 'u': uCF, 's': sCF, 'v': vCF}
 
 class stateProps():
     """
     for storage and retrieval of a thermodynamic state
     T, P, u, h, s, v
     """
-    def __init__(self):
-        self.name = None
-        self.T = None
-        self.P = None
-        self.h = None
-        self.u = None
-        self.s = None
-        self.v = None
-
-    # this is overloading the multiply operator.  Allows me to multiply a scalar or do a dot product (i.e., b=s*a or c=b*a)
+    __slots__ = ('name', 'T', 'P', 'h', 'u', 's', 'v')
+
+    def __init__(self, name=None, T=None, P=None, h=None, u=None, s=None, v=None):
+        self.name = name
+        self.T = T
+        self.P = P
+        self.h = h
+        self.u = u
+        self.s = s
+        self.v = v
+
+    def copy(self):
+        """
+        A cheap copy (the properties are all immutable numbers).
+        """
+        return stateProps(self.name, self.T, self.P, self.h, self.u, self.s, self.v)
+
+    # this is overloading the multiply operator.  Allows me to multiply by a scalar (i.e., b=a*s)
+    # T and P are intensive, so only h, u, s and v are scaled.
     def __mul__(self, other):
-        if type(other) in (float, int):
-            b=stateProps()
+        if isinstance(other, (int, float, np.number)):
+            b=self.copy()
             b.h*=other
             b.u*=other
             b.s*=other
             b.v*=other
             return b
+        return NotImplemented
 
     # this is overloading the __rmul__ operator so that s*Pt works.
     def __rmul__(self,other):
@@ -95,43 +76,25 @@ class stateProps():
 
     # this is overloading the division operator.  Allows me to divide by a scalar (i.e., b=a/s)
     def __truediv__(self, other):
-        if type(other) in (float, int):
-            b = stateProps()
+        if isinstance(other, (int, float, np.number)):
+            b = self.copy()
             b.h /= other
             b.u /= other
             b.s /= other
             b.v /= other
             return b
+        return NotImplemented
 
     def ConvertStateData(self, SI=True, mass=False, total=False, n=1.0, MW=1.0, Units=None):
         UC=Units if Units is not None else units()
         UC.set(SI=SI, mass=mass, total=total)
-        mCF = 1.0 if SI else UC.CF_Mass
-        TCF = 1.0 if SI else UC.CF_T
-        PCF = 1.0 if SI else UC.CF_P
-        vCF = 1.0 if SI else UC.CF_v  # convert m^3/mol to ft^3/lbmol
-        uCF = 1.0 if SI else UC.CF_e  # cpmvert J/mol to Btu/lbmol
-        hCF = 1.0 if SI else UC.CF_e
-        sCF = 1.0 if SI else UC.CF_s
-        nCF = 1.0 if SI else UC.CF_n  # convert mol to lbmol
-        if mass:
-            mCF/=MW
-            vCF/=MW
-            uCF/=MW
-            hCF/=MW
-            sCF/=MW
-        elif total:
-            vCF*=n*nCF
-            uCF*=n*nCF
-            hCF*=n*nCF
-            sCF*=n*nCF
-
-        self.P*=PCF
-        self.T*=TCF
-        self.h*=hCF
-        self.u*=uCF
-        self.v*=vCF
-        self.s*=sCF
+        CF=conversionFactors(SI=SI, mass=mass, total=total, n=n, MW=MW, Units=UC)
+        self.P*=CF['P']
+        self.T*=CF['T']
+        self.h*=CF['h']
+        self.u*=CF['u']
+        self.v*=CF['v']
+        self.s*=CF['s']
 
     def getVal(self, name='T'):
         n=name.lower()
@@ -157,6 +120,138 @@ class stateProps():
         print('h={:0.4f} {}'.format(self.h, self.U.hUnits))
         print('s={:0.4f} {}'.format(self.s, self.U.sUnits))
 
+class StateArray():
+    """
+    A column store of many thermodynamic states:  one numpy array each for T, P, u, h, s and v.
+    Iterating over a StateArray gives the columns in the order (T, P, u, h, s, v), so it unpacks like the
+    tuple StateDataForPlotting.add takes.  Indexing with an int gives a stateProps, with a slice or mask a StateArray.
+    """
+    __slots__ = ('name', 'T', 'P', 'u', 'h', 's', 'v')
+    columns = ('T', 'P', 'u', 'h', 's', 'v')
+
+    def __init__(self, T=(), P=(), u=(), h=(), s=(), v=(), name=None):
+        self.name = name
+        self.T = np.asarray(T, dtype=float)
+        self.P = np.asarray(P, dtype=float)
+        self.u = np.asarray(u, dtype=float)
+        self.h = np.asarray(h, dtype=float)
+        self.s = np.asarray(s, dtype=float)
+        self.v = np.asarray(v, dtype=float)
+
+    @classmethod
+    def fromStates(cls, states, name=None):
+        """
+        Packs a sequence of stateProps into a StateArray.
+        """
+        return cls(*[[getattr(st, col) for st in states] for col in cls.columns], name=name)
+
+    def __len__(self):
+        return self.T.size
+
+    def __iter__(self):
+        return iter([self.T, self.P, self.u, self.h, self.s, self.v])
+
+    def __getitem__(self, i):
+        if isinstance(i, (int, np.integer)):
+            return stateProps(name=self.name, T=float(self.T[i]), P=float(self.P[i]), h=float(self.h[i]),
+                              u=float(self.u[i]), s=float(self.s[i]), v=float(self.v[i]))
+        return StateArray(self.T[i], self.P[i], self.u[i], self.h[i], self.s[i], self.v[i], name=self.name)
+
+    def copy(self):
+        return StateArray(self.T.copy(), self.P.copy(), self.u.copy(), self.h.copy(), self.s.copy(), self.v.copy(),
+                          name=self.name)
+
+    def append(self, other):
+        """
+        Adds the states of another StateArray (or anything that unpacks into the 6 columns) to the end.
+        :return: self
+        """
+        for col, data in zip(self.columns, other):
+            setattr(self, col, np.concatenate((getattr(self, col), np.ravel(data))))
+        return self
+
+    def __mul__(self, other):
+        if isinstance(other, (int, float, np.number)):
+            b = self.copy()
+            b.h*=other
+            b.u*=other
+            b.s*=other
+            b.v*=other
+            return b
+        return NotImplemented
+
+    def __rmul__(self, other):
+        return self*other
+
+    def __truediv__(self, other):
+        if isinstance(other, (int, float, np.number)):
+            b = self.copy()
+            b.h/=other
+            b.u/=other
+            b.s/=other
+            b.v/=other
+            return b
+        return NotImplemented
+
+    def ConvertStateData(self, SI=True, mass=False, total=False, n=1.0, MW=1.0, Units=None):
+        """
+        Converts every state in place from molar metric units (see stateProps.ConvertStateData).
+        """
+        UC=Units if Units is not None else units()
+        UC.set(SI=SI, mass=mass, total=total)
+        CF=conversionFactors(SI=SI, mass=mass, total=total, n=n, MW=MW, Units=UC)
+        for col in self.columns:
+            setattr(self, col, getattr(self, col)*CF[col])
+
+    def getVal(self, name='T'):
+        n=name.lower()
+        if n == 't':
+            return self.T
+        if n == 'h':
+            return self.h
+        if n == 'u':
+            return self.u
+        if n == 's':
+            return self.s
+        if n == 'v':
+            return self.v
+        if n == 'p':
+            return self.P
+
+    def getDataCol(self, W='T'):
+        return self.getVal(W)
+
+class StateDataForPlotting(StateArray):
+    """
+    I'm making this class for easy storage of data for plotting.
+    """
+    __slots__ = ()
+
+    def __init__(self):
+        super().__init__()
+
+    def clear(self):
+        StateArray.__init__(self)
+
+    def add(self, vals):
+        self.append([[val] for val in vals])
+
+    def getAxisLabel(self, W='T', Units=None):
+        Units = Units if Units is not None else units()
+        w=W.lower()
+        if w == 't':
+            return Units.TPlotUnits
+        if w == 'h':
+            return Units.hPlotUnits
+        if w == 'u':
+            return Units.uPlotUnits
+        if w == 's':
+            return Units.sPlotUnits
+        if w == 'v':
+            return Units.vPlotUnits
+        if w == 'p':
+            return Units.PPlotUnits
+
 class units():
     """
     For air, I'm assuming the default units are on a molar basis.
@@ -309,6 +404,20 @@ class air():
         self.State=stateProps()
         self.n = 1.0  # moles
         self.m=self.n*self.MW/1000.0  # mass in kg
+        #region cp polynomial coefficients cp/Rbar=a+b*T+c*T**2+d*T**3+e*T**4
+        self.TLowRange = 1630.0  # K, the coefficients switch from the low to the high range here
+        self.cpCoeffLow = (3.653, -1.337E-3, 3.294E-6, -1.913E-9, 0.2763E-12)
+        self.cpCoeffHigh = (2.753, 0.002, -1.0E-6, 3.0E-10, -3.0E-14)
+        # integration constants that make the antiderivatives continuous at TLowRange
+        self.intCpOffset = self._intCpPoly(self.TLowRange, self.cpCoeffLow)-self._intCpPoly(self.TLowRange, self.cpCoeffHigh)
+        self.intCpOverTOffset = self._intCpOverTPoly(self.TLowRange, self.cpCoeffLow)-self._intCpOverTPoly(self.TLowRange, self.cpCoeffHigh)
+        # range of temperatures where the cp fit stays physical (used to bracket temperature inversions)
+        self.TMin = 1.0  # K
+        self.TMax = 6000.0  # K
+        #endregion
+        self.Tables = None  # optional propertyTable for fast inverse lookups (see useTables)
+        self.solverInfo = threading.local()  # per thread, so one air can be shared by threads (see SolverIterations)
+        self.Cache = None  # optional stateCache of calculated states (see useCache)
 
     def cv(self, T):
         return self.cp(T)-self.RBar
@@ -322,14 +431,85 @@ class air():
         :return: molar specific heat in units of kJ/kg
         :rtype: float
         """
-        TLowRange=1630.0
-        a = 3.653 if T<TLowRange else 2.753
-        b = -1.337E-3 if T<TLowRange else 0.002
-        c = 3.294E-6 if T<TLowRange else -1.0E-6
-        d = -1.913E-9  if T<TLowRange else 3.0E-10
-        e = 0.2763E-12  if T<TLowRange else -3.0E-14
+        if isinstance(T, np.ndarray):
+            a, b, c, d, e = self._cpCoeffArrays(T)
+        else:
+            a, b, c, d, e = self.cpCoeffLow if T<self.TLowRange else self.cpCoeffHigh
         return self.RBar*(a+b*T+c*T**2+d*T**3+e*T**4)
 
+    def _cpCoeffArrays(self, T):
+        """
+        Picks the low or high range cp coefficients element by element for an array of temperatures.
+        :param T: numpy array of temperatures in K
+        :return: list of coefficient arrays [a, b, c, d, e]
+        """
+        low = T<self.TLowRange
+        return [np.where(low, cLow, cHigh) for cLow, cHigh in zip(self.cpCoeffLow, self.cpCoeffHigh)]
+
+    #region closed form integrals of cp, cv, cp/T and cv/T
+    def _intCpPoly(self, T, coeff):
+        """
+        Antiderivative of cp for one set of polynomial coefficients (no integration constant).
+        int(cp dT)=Rbar*(a*T+b*T**2/2+c*T**3/3+d*T**4/4+e*T**5/5)
+        """
+        a, b, c, d, e = coeff
+        return self.RBar*T*(a+T*(b/2.0+T*(c/3.0+T*(d/4.0+T*e/5.0))))
+
+    def _intCpOverTPoly(self, T, coeff):
+        """
+        Antiderivative of cp/T for one set of polynomial coefficients (no integration constant).
+        int(cp/T dT)=Rbar*(a*ln(T)+b*T+c*T**2/2+d*T**3/3+e*T**4/4)
+        """
+        a, b, c, d, e = coeff
+        lnT = np.log(T) if isinstance(T, np.ndarray) else math.log(T)
+        return self.RBar*(a*lnT+T*(b+T*(c/2.0+T*(d/3.0+T*e/4.0))))
+
+    def intCp(self, T):
+        """
+        Antiderivative of cp(T) that is continuous across the coefficient switch at TLowRange.
+        deltah(T1,T2)=intCp(T2)-intCp(T1)
+        :param T: Temperature in K (float or numpy array)
+        :return: J/mol
+        """
+        if isinstance(T, np.ndarray):
+            return np.where(T<self.TLowRange, self._intCpPoly(T, self.cpCoeffLow),
+                            self._intCpPoly(T, self.cpCoeffHigh)+self.intCpOffset)
+        if T<self.TLowRange:
+            return self._intCpPoly(T, self.cpCoeffLow)
+        return self._intCpPoly(T, self.cpCoeffHigh)+self.intCpOffset
+
+    def intCv(self, T):
+        """
+        Antiderivative of cv(T)=cp(T)-Rbar.
+        :param T: Temperature in K
+        :return: J/mol
+        """
+        return self.intCp(T)-self.RBar*T
+
+    def intCpOverT(self, T):
+        """
+        Antiderivative of cp(T)/T that is continuous across the coefficient switch at TLowRange.
+        This is the standard state entropy s°(T) to within a constant.
+        :param T: Temperature in K (float or numpy array)
+        :return: J/mol*K
+        """
+        if isinstance(T, np.ndarray):
+            return np.where(T<self.TLowRange, self._intCpOverTPoly(T, self.cpCoeffLow),
+                            self._intCpOverTPoly(T, self.cpCoeffHigh)+self.intCpOverTOffset)
+        if T<self.TLowRange:
+            return self._intCpOverTPoly(T, self.cpCoeffLow)
+        return self._intCpOverTPoly(T, self.cpCoeffHigh)+self.intCpOverTOffset
+
+    def intCvOverT(self, T):
+        """
+        Antiderivative of cv(T)/T=cp(T)/T-Rbar/T.
+        :param T: Temperature in K
+        :return: J/mol*K
+        """
+        lnT = np.log(T) if isinstance(T, np.ndarray) else math.log(T)
+        return self.intCpOverT(T)-self.RBar*lnT
+    #endregion
+
     def deltau(self, T1=None, T2=None):
         """
         To calculate changes in molar internal energy for air as an ideal gas u=u(T)
@@ -345,7 +525,7 @@ class air():
             T1=self.StandardState.T
         if T2 is None:
             T2=self.StandardState.T
-        return quad(self.cv,T1,T2)[0]
+        return self.intCv(T2)-self.intCv(T1)
 
     def deltah(self, T1=None, T2=None):
         """
@@ -362,7 +542,7 @@ class air():
             T1=self.StandardState.T
         if T2 is None:
             T2 = self.StandardState.T
-        return quad(self.cp,T1,T2)[0]
+        return self.intCp(T2)-self.intCp(T1)
 
     def deltas_tv(self, T1=None, T2=None, V1=None, V2=None):
         """
@@ -387,8 +567,7 @@ class air():
             V1 = self.StandardState.v
         if V2 is None:
             V2 = self.StandardState.v
-        fn=lambda T: 0 if T==0 else self.cv(T)/T
-        deltaS=quad(fn,T1,T2)[0]
+        deltaS=self.intCvOverT(T2)-self.intCvOverT(T1)
         deltaS+=self.RBar*math.log(V2/V1)
         return deltaS
 
@@ -416,11 +595,17 @@ class air():
         if P2 is None:
             P2 = self.StandardState.P
 
-        fn=lambda T: 0 if T==0.0 else self.cp(T)/T
-        deltaS=quad(fn,T1,T2)[0]
+        deltaS=self.intCpOverT(T2)-self.intCpOverT(T1)
         deltaS+=self.RBar*math.log(P1/P2)
         return deltaS
 
+    @property
+    def SolverIterations(self):
+        """
+        Newton iterations used by the last temperature inversion (see solveT) made by the calling thread.
+        """
+        return getattr(self.solverInfo, 'iterations', 0)
+
     def set(self, P=None, T=None, v=None, h=None, u=None, s=None, name=None):
         """
         This allows me to set two properties and calculate the state of the air
@@ -431,22 +616,49 @@ class air():
         :param h: specific enthalpy in J/mol
         :param s: specific entropy in J/mol*K
         :param name: a convenient name
-        :return: a deep copy of the calculated state
-        """
-        self.State.P = P  # pressure - Pa
-        self.State.T = T  # Temperature - K
-        self.State.v = v  # specific volume - m^3/mol
-        self.State.h = h  # specific enthalpy - J/mol
-        self.State.u = u  # specific internal energy - J/mol
-        self.State.s = s  # entropy - J/(mol*K)
-        self.State.name=name
+        :return: a copy of the calculated state
+        """
         if T == None and P==None and u==None and v == None and h == None and s == None:
+            self.State = stateProps(name=name)
             return
-        else:
-            self.calc()
-        return dc(self.State)  # need to deep copy so not passing just a reference back
+        self.State = self.evaluate(P=P, T=T, v=v, h=h, u=u, s=s, name=name)
+        return self.State.copy()  # need to copy so not passing just a reference back
+
+    def evaluate(self, P=None, T=None, v=None, h=None, u=None, s=None, name=None):
+        """
+        The stateless version of set:  calculates the state from two properties and returns it without touching
+        self.State (or anything else on self), so one air object can be shared by many threads with no locking.
+        The optional cache (see useCache) is locked internally.
+        :param P: pressure in Pa
+        :param T: Temperature in K
+        :param v: specific volume in m^3/mol
+        :param u: specific internal energy in J/mol
+        :param h: specific enthalpy in J/mol
+        :param s: specific entropy in J/mol*K
+        :param name: a convenient name
+        :return: a new stateProps
+        """
+        Cache = self.Cache
+        if Cache is not None:
+            key = Cache.key(P=P, T=T, v=v, h=h, u=u, s=s)
+            cached = Cache.get(key)
+            if cached is not None:
+                State = cached.copy()
+                State.name = name
+                return State
+        State = stateProps(name=name, T=T, P=P, h=h, u=u, s=s, v=v)
+        self.calcState(State)
+        if Cache is not None:
+            Cache.put(key, State.copy())
+        return State
 
     def calc(self):
+        """
+        Calculates self.State from the two properties that are set in it (see calcState).
+        """
+        self.calcState(self.State)
+
+    def calcState(self, State):
         '''
         To calculate the state of ideal gas air, we use the ideal gas law and specific heat functions relative to
         the standard state of T=0C, P=101.325 kPa where u=0, h=0, s=0, v=vo by declaration
@@ -456,125 +668,395 @@ class air():
         u: v, h, s  (because u & h are only dependent on T for an ideal gas, specifying u+h does not work)
         v: h, s
         h: s
-        :return: a deep copy of the state in specific molar properties
+        :param State: a stateProps with two properties set.  The others are filled in (in place).
+        :return: none
         '''
         # 1. need to determine which two properties are known
         # 2. calculate all the other thermodynamic properties
-        State=stateProps()
         #region case 1. P,T
-        if self.State.P is not None and self.State.T is not None:
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.h=self.deltah(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T, P2=self.State.P)
+        if State.P is not None and State.T is not None:
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
+            State.h=self.deltah(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T, P2=State.P)
         #endregion
         #region case 2. P,u
-        elif self.State.P is not None and self.State.u is not None:
-            fn = lambda T: self.deltau(T2=T[0])-self.State.u
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.h=self.deltah(T2 = self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T,P2=self.State.P)
+        elif State.P is not None and State.u is not None:
+            State.T=self.T_from('u', State.u)
+            State.v=self.RBar*State.T/State.P
+            State.h=self.deltah(T2 = State.T)
+            State.s=self.deltas_tp(T2=State.T,P2=State.P)
         #endregion
         #region case 3. P,v
-        elif self.State.P is not None and self.State.v is not None:
-            self.State.T=self.State.v*self.State.P/self.RBar
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.h=self.deltah(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T,P2=self.State.P)
+        elif State.P is not None and State.v is not None:
+            State.T=State.v*State.P/self.RBar
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
+            State.h=self.deltah(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T,P2=State.P)
         #endregion
         #region case 4. P,h
-        elif self.State.P is not None and self.State.h is not None:
-            fn = lambda T: self.deltah(T2=T[0])-self.State.h
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T,P2=self.State.P)
+        elif State.P is not None and State.h is not None:
+            State.T=self.T_from('h', State.h)
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T,P2=State.P)
         #endregion
         #region case 5. P,s
-        elif self.State.P is not None and self.State.s is not None:
-            fn = lambda T: self.deltas_tp(T2=T[0], P2=self.State.P)-self.State.s
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.h=self.deltah(T2=self.State.T)
+        elif State.P is not None and State.s is not None:
+            State.T=self.T_from('s0', State.s-self.RBar*math.log(self.StandardState.P/State.P))
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
+            State.h=self.deltah(T2=State.T)
         #endregion
         #region case 6. T,u  # T & u not independent
         #endregion
         #region case 7. T,v
-        elif self.State.T is not None and self.State.v is not None:
-            self.State.P=self.State.T*self.RBar/self.State.v
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.h=self.deltah(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T,P2=self.State.P)
+        elif State.T is not None and State.v is not None:
+            State.P=State.T*self.RBar/State.v
+            State.u=self.deltau(T2=State.T)
+            State.h=self.deltah(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T,P2=State.P)
         #endregion
         #region case 8. T,h # T & h not independent
         #endregion
         #region case 9. T,s
-        elif self.State.T is not None and self.State.s is not None:
-            fn = lambda P: self.deltas_tp(T2=self.State.T, P2=P[0])-self.State.s
-            r = fsolve(fn, np.array([50]))
-            self.State.P=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.h=self.deltah(T2=self.State.T)
+        elif State.T is not None and State.s is not None:
+            State.P=self.P_from_Ts(State.T, State.s)
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
+            State.h=self.deltah(T2=State.T)
         #endregion
-        #region case 10. T,v
-        elif self.State.u is not None and self.State.v is not None:
-            fn = lambda T: self.deltau(T2=T[0])-self.State.u
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.P=self.State.T*self.RBar/self.State.v
-            self.State.h=self.deltah(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T,P2=self.State.P)
+        #region case 10. u,v
+        elif State.u is not None and State.v is not None:
+            State.T=self.T_from('u', State.u)
+            State.P=State.T*self.RBar/State.v
+            State.h=self.deltah(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T,P2=State.P)
         #endregion
         #region case 11. u,h # u & h not independent
         #endregion
-        #region case 12. T,s
-        elif self.State.u is not None and self.State.s is not None:
-            fn = lambda T: self.deltau(T2=T[0])-self.State.u
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            fn = lambda P: self.deltas_tp(T2=self.State.T, P2=P)-self.State.s
-            r = fsolve(fn, np.array([50]))
-            self.State.P=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.h=self.deltah(T2=self.State.T)
+        #region case 12. u,s
+        elif State.u is not None and State.s is not None:
+            State.T=self.T_from('u', State.u)
+            State.P=self.P_from_Ts(State.T, State.s)
+            State.v=self.RBar*State.T/State.P
+            State.h=self.deltah(T2=State.T)
         #endregion
         #region case 13. v,h
-        elif self.State.v is not None and self.State.h is not None:
-            fn = lambda T: self.deltah(T2=T[0])-self.State.h
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.P=self.State.T*self.RBar/self.State.v
-            self.State.u=self.deltau(T2=self.State.T)
-            self.State.s=self.deltas_tp(T2=self.State.T, P2=self.State.P)
+        elif State.v is not None and State.h is not None:
+            State.T=self.T_from('h', State.h)
+            State.P=State.T*self.RBar/State.v
+            State.u=self.deltau(T2=State.T)
+            State.s=self.deltas_tp(T2=State.T, P2=State.P)
         #endregion
         #region case 14. v,s
-        elif self.State.v is not None and self.State.s is not None:
-            fn = lambda T: self.deltas_tv(T2=T[0], V2=self.State.v)-self.State.s
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            self.State.P = self.RBar * self.State.T / self.State.v
-            self.State.h = self.deltah(T2=self.State.T)
-            self.State.u = self.deltau(T2=self.State.T)
+        elif State.v is not None and State.s is not None:
+            State.T=self.T_from('sv0', State.s-self.RBar*math.log(State.v/self.StandardState.v))
+            State.P = self.RBar * State.T / State.v
+            State.h = self.deltah(T2=State.T)
+            State.u = self.deltau(T2=State.T)
         #endregion
         #region case 15. h,s
-        elif self.State.h is not None and self.State.s is not None:
-            fn = lambda T: self.deltah(T2=T[0])-self.State.h
-            r = fsolve(fn, np.array([50]))
-            self.State.T=r[0]
-            fn = lambda P: self.deltas_tp(T2=self.State.T, P2=P)-self.State.s
-            r = fsolve(fn, np.array([50]))
-            self.State.P=r[0]
-            self.State.v=self.RBar*self.State.T/self.State.P
-            self.State.u=self.deltau(T2=self.State.T)
+        elif State.h is not None and State.s is not None:
+            State.T=self.T_from('h', State.h)
+            State.P=self.P_from_Ts(State.T, State.s)
+            State.v=self.RBar*State.T/State.P
+            State.u=self.deltau(T2=State.T)
         #endregion
 
+    #region batch (array) state calculations
+    def set_many(self, P=None, T=None, v=None, h=None, u=None, s=None):
+        """
+        The array version of set/calc.  Any two properties may be given as numpy arrays (or anything that
+        broadcasts to a common shape) and every state is calculated at once without a python loop per state.
+        The same 15 property pairs as calc are handled and, like calc, if more than two properties are given
+        the first matching pair in calc's order is used.  self.State is not touched.
+        :param P: pressure in Pa
+        :param T: Temperature in K
+        :param v: specific volume in m^3/mol
+        :param u: specific internal energy in J/mol
+        :param h: specific enthalpy in J/mol
+        :param s: specific entropy in J/(mol*K)
+        :return: a StateArray (unpacks into the columns T, P, u, h, s, v like StateDataForPlotting.add takes)
+        """
+        given = {k: val for k, val in (('P', P), ('T', T), ('v', v), ('h', h), ('u', u), ('s', s)) if val is not None}
+        arrays = np.broadcast_arrays(*[np.asarray(val, dtype=float) for val in given.values()])
+        given = dict(zip(given.keys(), arrays))
+        P, T, v, h, u, s = [given.get(k) for k in ('P', 'T', 'v', 'h', 'u', 's')]
+        RBar = self.RBar
+        SS = self.StandardState
+        sT0 = self.intCpOverT(SS.T)  # s°(T0) for the entropy datum
+        #region case 1. P,T
+        if P is not None and T is not None:
+            pass
+        #endregion
+        #region case 2. P,u
+        elif P is not None and u is not None:
+            T = self.T_from('u', u)
+        #endregion
+        #region case 3. P,v
+        elif P is not None and v is not None:
+            T = v*P/RBar
+        #endregion
+        #region case 4. P,h
+        elif P is not None and h is not None:
+            T = self.T_from('h', h)
+        #endregion
+        #region case 5. P,s
+        elif P is not None and s is not None:
+            T = self.T_from('s0', s-RBar*np.log(SS.P/P))
+        #endregion
+        #region case 7. T,v
+        elif T is not None and v is not None:
+            P = T*RBar/v
+        #endregion
+        #region case 9. T,s
+        elif T is not None and s is not None:
+            P = self.P_from_Ts(T, s)
+        #endregion
+        #region case 10. u,v
+        elif u is not None and v is not None:
+            T = self.T_from('u', u)
+            P = T*RBar/v
+        #endregion
+        #region case 12. u,s
+        elif u is not None and s is not None:
+            T = self.T_from('u', u)
+            P = self.P_from_Ts(T, s)
+        #endregion
+        #region case 13. v,h
+        elif v is not None and h is not None:
+            T = self.T_from('h', h)
+            P = T*RBar/v
+        #endregion
+        #region case 14. v,s
+        elif v is not None and s is not None:
+            T = self.T_from('sv0', s-RBar*np.log(v/SS.v))
+            P = T*RBar/v
+        #endregion
+        #region case 15. h,s
+        elif h is not None and s is not None:
+            T = self.T_from('h', h)
+            P = self.P_from_Ts(T, s)
+        #endregion
+        else:
+            raise ValueError('set_many needs two independent properties, got: {}'.format(', '.join(given.keys())))
+
+        # every other property follows from T and P.  The given properties are passed back unchanged.
+        if v is None:
+            v = RBar*T/P
+        if u is None:
+            u = self.intCv(T)-self.intCv(SS.T)
+        if h is None:
+            h = self.intCp(T)-self.intCp(SS.T)
+        if s is None:
+            s = self.intCpOverT(T)-sT0+RBar*np.log(SS.P/P)
+        return StateArray(T, P, u, h, s, v)
+
+    #region process paths
+    def isentropeT(self, v, T0, v0):
+        """
+        Temperatures along isentropes.  The path ODE
+        Tds=cv*dT+P*dv=0 -> dT/dv=-Rbar*T/(cv*v)
+        separates to cv/T*dT=-Rbar*dv/v, and both sides integrate in closed form:
+        intCvOverT(T)=intCvOverT(T0)-Rbar*ln(v/v0)
+        so any number of points (on any number of isentropes) is one vectorized temperature inversion.
+        :param v: molar volumes in m^3/mol
+        :param T0: temperature in K at v0 (broadcasts against v)
+        :param v0: molar volume in m^3/mol where the isentrope passes through T0
+        :return: numpy array of temperatures in K
+        """
+        v, T0, v0 = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in (v, T0, v0)])
+        sv0 = self.intCvOverT(T0)-self.intCvOverT(self.StandardState.T)-self.RBar*np.log(v/v0)
+        T = self.T_from('sv0', sv0)
+        return np.where(v==v0, T0, T)
+
+    def isentropicPath(self, v, T0):
+        """
+        States along the isentrope that passes through T0 at v[0] (see isentropeT).
+        :param v: molar volumes in m^3/mol
+        :param T0: temperature in K at v[0]
+        :return: a StateArray of the states at v
+        """
+        v = np.asarray(v, dtype=float)
+        return self.set_many(T=self.isentropeT(v, T0, v.flat[0]), v=v)
+
+    def isochoricPath(self, T, v):
+        """
+        States along a constant volume process through the temperatures T.  Nothing needs solving: P=Rbar*T/v.
+        :param T: temperatures in K
+        :param v: the molar volume in m^3/mol
+        :return: a StateArray of the states at T
+        """
+        return self.set_many(T=T, v=v)
+    #endregion
+
+    def P_from_Ts(self, T, s):
+        """
+        deltas_tp is linear in ln(P), so the pressure follows in closed form from T and s:
+        s=s°(T)-s°(T0)-Rbar*ln(P/P0) -> P=P0*exp((s°(T)-s°(T0)-s)/Rbar)
+        :param T: Temperature in K (float or numpy array)
+        :param s: specific entropy in J/(mol*K) (float or numpy array)
+        :return: pressure in Pa
+        """
+        SS = self.StandardState
+        exp = np.exp if isinstance(T, np.ndarray) or isinstance(s, np.ndarray) else math.exp
+        return SS.P*exp((self.intCpOverT(T)-self.intCpOverT(SS.T)-s)/self.RBar)
+
+    def antiderivative(self, prop):
+        """
+        The increasing function of T behind each temperature inversion.
+        :param prop: 'u', 'h', 's0' (entropy at P0) or 'sv0' (entropy at v0)
+        :return: intCv, intCp, intCpOverT or intCvOverT
+        """
+        return {'u': self.intCv, 'h': self.intCp, 's0': self.intCpOverT, 'sv0': self.intCvOverT}[prop]
+
+    def derivative(self, prop):
+        """
+        The exact derivative with respect to T of antiderivative(prop):  cv, cp, cp/T or cv/T.
+        :param prop: 'u', 'h', 's0' or 'sv0'
+        :return: a function of T
+        """
+        if prop == 'u':
+            return self.cv
+        if prop == 'h':
+            return self.cp
+        if prop == 's0':
+            return lambda T: self.cp(T)/T
+        return lambda T: self.cv(T)/T
+
+    def T_from(self, prop, val):
+        """
+        Finds the temperature where a temperature-only property, measured from the standard state, equals val:
+        u(T)=intCv(T)-intCv(T0), h(T)=intCp(T)-intCp(T0), s0(T)=s(T,P0), sv0(T)=s(T,v0).
+        Uses the property tables if useTables was called, otherwise the root solver.
+        :param prop: 'u', 'h', 's0' or 'sv0'
+        :param val: the property value (float or numpy array) in J/mol or J/mol*K
+        :return: Temperature in K
+        """
+        if self.Tables is not None:
+            T = self.Tables.T_from(prop, val)
+            if isinstance(T, np.ndarray):
+                outside = np.isnan(T)
+                if not outside.any():
+                    return T
+                T[outside] = self.T_from_solver(prop, val[outside])
+                return T
+            if not math.isnan(T):
+                return T
+        return self.T_from_solver(prop, val)
+
+    def T_from_solver(self, prop, val):
+        """
+        Root solves for T (see T_from) without the tables and records the iteration count in SolverIterations
+        (for the calling thread).
+        """
+        T, self.solverInfo.iterations = self.solveT(prop, val)
+        return T
+
+    def useTables(self, on=True, dT=1.0):
+        """
+        Switches the table backed inverse lookups (see propertyTable) on or off.
+        :param on: True to use tables
+        :param dT: temperature spacing of the table in K
+        :return: the propertyTable (None if switched off)
+        """
+        if not on:
+            self.Tables = None
+        elif self.Tables is None or self.Tables.dT != dT:
+            self.Tables = propertyTable(self, dT=dT)
+        return self.Tables
+
+    def guessT(self, prop, val):
+        """
+        Starting guess for solveT from constant specific heats evaluated at the standard state:
+        u=cv0*(T-T0), h=cp0*(T-T0), s0=cp0*ln(T/T0), sv0=cv0*ln(T/T0)
+        :param prop: 'u', 'h', 's0' or 'sv0'
+        :param val: the property value (float or numpy array)
+        :return: Temperature in K, limited to [TMin, TMax]
+        """
+        T0 = self.StandardState.T
+        cp0 = self.cp(T0)
+        cv0 = cp0-self.RBar
+        if prop == 'u':
+            T = T0+val/cv0
+        elif prop == 'h':
+            T = T0+val/cp0
+        else:
+            T = T0*np.exp(np.minimum(val/(cp0 if prop == 's0' else cv0), 5.0))
+        return np.clip(T, self.TMin, self.TMax)
+
+    def useCache(self, on=True, maxSize=1024, rtol=1e-12):
+        """
+        Switches the LRU cache of states calculated by set on or off (see stateCache).
+        :param on: True to use the cache
+        :param maxSize: most states to keep
+        :param rtol: relative quantization of the inputs used for the cache key
+        :return: the stateCache (None if switched off)
+        """
+        if not on:
+            self.Cache = None
+        elif self.Cache is None or self.Cache.maxSize != maxSize or self.Cache.rtol != rtol:
+            self.Cache = stateCache(maxSize=maxSize, rtol=rtol)
+        return self.Cache
+
+    def solveT(self, prop, val, tol=1e-12, maxIter=50):
+        """
+        Safeguarded Newton solve for the temperature where a temperature-only property takes the value val
+        (see T_from).  The derivative is exact (cv, cp, cp/T or cv/T) and every iterate keeps a bracket
+        [TLow, THigh] on the root, starting from the range of the cp fit [TMin, TMax].  A Newton step that
+        would leave the bracket is replaced by bisection, so the solve always converges.  A value whose root is
+        outside [TMin, TMax] gives nan (like propertyTable.T_from outside its table) instead of the end of the bracket.
+        Works element by element on numpy arrays; there the iteration count is the number of sweeps.
+        :param prop: 'u', 'h', 's0' or 'sv0'
+        :param val: the property value (float or numpy array) relative to the standard state
+        :param tol: relative change in T that counts as converged
+        :param maxIter: most Newton iterations to take
+        :return: (T, iterations)
+        """
+        fn = self.antiderivative(prop)
+        dfn = self.derivative(prop)
+        target = val+fn(self.StandardState.T)
+        T = self.guessT(prop, val)
+        rMin, rMax = fn(self.TMin)-target, fn(self.TMax)-target
+        if isinstance(val, np.ndarray):
+            outside = (rMin > 0) | (rMax < 0)
+            if outside.all():
+                return np.full(T.shape, np.nan), 0
+            TLow = np.full(T.shape, self.TMin)
+            THigh = np.full(T.shape, self.TMax)
+            for i in range(1, maxIter+1):
+                r = fn(T)-target
+                TLow = np.where(r<0, T, TLow)
+                THigh = np.where(r<0, THigh, T)
+                TNew = T-r/dfn(T)
+                TNew = np.where((TNew>=TLow) & (TNew<=THigh), TNew, 0.5*(TLow+THigh))
+                converged = np.all((np.abs(TNew-T)<=tol*T) | outside)
+                T = TNew
+                if converged:
+                    break
+            return np.where(outside, np.nan, T), i
+        if rMin > 0 or rMax < 0:
+            return math.nan, 0
+        T = float(T)
+        TLow, THigh = self.TMin, self.TMax
+        for i in range(1, maxIter+1):
+            r = fn(T)-target
+            if r<0:
+                TLow = T
+            else:
+                THigh = T
+            TNew = T-r/dfn(T)
+            if not TLow<=TNew<=THigh:
+                TNew = 0.5*(TLow+THigh)
+            converged = abs(TNew-T)<=tol*T
+            T = TNew
+            if converged:
+                break
+        return T, i
+    #endregion
+
     def getSummary_MassBasis(self, units=None):
         UC=units if units is not None else units()
         mCF=1.0 if UC.SI else UC.CF_Mass
@@ -625,6 +1107,118 @@ class air():
         print('h={:0.4f} {}'.format(ext.h, 'kJ'))
         print('s={:0.4f} {}'.format(ext.s, 'kJ/K'))
 
+class stateCache():
+    """
+    A bounded, least recently used memo of states calculated by air.set.
+    The key is the input property pair with each value quantized to a relative tolerance rtol, so inputs that
+    differ by less than about rtol share an entry (and get the state calculated for the first of them).
+    hits and misses count the lookups since the cache was made or cleared.
+    """
+    def __init__(self, maxSize=1024, rtol=1e-12):
+        """
+        :param maxSize: most states to keep before the least recently used one is dropped
+        :param rtol: relative quantization of the inputs (0 keys on the exact values)
+        """
+        self.maxSize = maxSize
+        self.rtol = rtol
+        self.states = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()  # so threads sharing an air can share its cache
+
+    def quantize(self, val):
+        if self.rtol <= 0.0:
+            return float(val)
+        m, e = math.frexp(val)  # val=m*2**e with 0.5<=|m|<1
+        return e, round(m/self.rtol)
+
+    def key(self, **props):
+        """
+        Makes the cache key from the given (not None) properties.
+        """
+        return tuple((name, self.quantize(val)) for name, val in props.items() if val is not None)
+
+    def get(self, key):
+        """
+        :return: the cached state for key (None on a miss)
+        """
+        with self.lock:
+            state = self.states.get(key)
+            if state is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.states.move_to_end(key)
+            return state
+
+    def put(self, key, state):
+        with self.lock:
+            self.states[key] = state
+            self.states.move_to_end(key)
+            while len(self.states) > self.maxSize:
+                self.states.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.states.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def info(self):
+        """
+        :return: dictionary of hits, misses, size and maxSize
+        """
+        with self.lock:
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self.states), 'maxSize': self.maxSize}
+
+class propertyTable():
+    """
+    Precomputed u(T), h(T), s0(T)=s(T,P0) and sv0(T)=s(T,v0) for air on a dense temperature grid.
+    Inverse lookups (property -> T) are monotone cubic (PCHIP) interpolations of T against the property, so a
+    lookup is a binary search plus a cubic instead of a root solve.  cp jumps at the 1630 K coefficient switch, so
+    the table is split into a low and a high segment there and each segment is interpolated on its own.
+    Error bound:  while building, the inverse is checked against the exact forward functions at the quarter points
+    of every interval and the worst temperature error is kept in maxTError[prop] (K).  With the default 1 K spacing
+    this is below 1e-5 K; the error scales roughly with dT**3.
+    Values outside [TLow, THigh] return nan so the caller can fall back on the solver.
+    """
+    def __init__(self, Air, dT=1.0, TLow=100.0, THigh=None):
+        """
+        :param Air: the air object whose property functions are tabulated
+        :param dT: grid spacing in K
+        :param TLow: lowest tabulated temperature in K
+        :param THigh: highest tabulated temperature in K (defaults to Air.TMax)
+        """
+        self.dT = dT
+        self.TLow = TLow
+        self.THigh = Air.TMax if THigh is None else THigh
+        TSwitch = Air.TLowRange
+        self.segments = [np.append(np.arange(self.TLow, TSwitch, dT), TSwitch),
+                         np.append(np.arange(TSwitch, self.THigh, dT), self.THigh)]
+        self.inverse = {}
+        self.maxTError = {}
+        for prop in ('u', 'h', 's0', 'sv0'):
+            fn = Air.antiderivative(prop)
+            datum = fn(Air.StandardState.T)
+            self.inverse[prop] = []
+            self.maxTError[prop] = 0.0
+            for T in self.segments:
+                inv = PchipInterpolator(fn(T)-datum, T, extrapolate=False)
+                TCheck = (T[:-1, None]+np.diff(T)[:, None]*np.array([0.25, 0.5, 0.75])).ravel()
+                err = np.max(np.abs(inv(fn(TCheck)-datum)-TCheck))
+                self.inverse[prop].append(inv)
+                self.maxTError[prop] = max(self.maxTError[prop], err)
+
+    def T_from(self, prop, val):
+        """
+        Looks up T for a value of u, h, s0 or sv0 (see air.T_from).
+        :return: Temperature in K (nan outside the table)
+        """
+        low, high = self.inverse[prop]
+        T = low(val)
+        T = np.where(np.isnan(T), high(val), T)
+        return T if isinstance(val, np.ndarray) else float(T)
+
 def main():
     a=air()
     a.set(P=a.StandardState.P, T=200)
@@ -0,0 +1,319 @@
+from Air import *
+import time
+import weakref
+
+# the constraints each kind of leg accepts (see cycleLeg)
+legConstraints = {'isentropic': ('v', 'ratio', 'T', 'P'),
+                  'isochoric': ('ratio', 'T', 'P'),
+                  'isobaric': ('v', 'ratio', 'T'),
+                  'isothermal': ('v', 'ratio', 'P')}
+
+# the inputs every cycle has and their values when a solve leaves them out (the same as solveOttoCycles)
+cycleInputs = {'t_initial': 298.0, 'p_initial': 1000.0, 'v_cylinder': 1.0}
+
+class cycleLeg():
+    def __init__(self, process, name=None, **constraint):
+        """
+        One process of a cycle of air, from the end of the leg before it (state 1 for the first leg).
+        A leg takes at most one constraint, which fixes its end state:
+            v      end volume/volume of state 1
+            ratio  end volume/start volume, or end pressure/start pressure for an isochoric leg
+            T      end temperature in K
+            P      end pressure in Pa
+        The value is a number, the name of a cycle parameter (e.g., 'ratio') or '1/' and a parameter name for its
+        reciprocal (e.g., '1/ratio' for the compression stroke of an engine with compression ratio ratio).
+        The last leg of a cycle takes no constraint:  it returns to state 1.
+        :param process: 'isentropic', 'isochoric', 'isobaric' or 'isothermal'
+        :param name: label of the leg (default '1-2' etc. from its place in the cycle)
+        :param constraint: at most one of v, ratio, T or P
+        """
+        if process not in legConstraints:
+            raise ValueError('unknown process {!r} (expected one of {})'.format(process, ', '.join(legConstraints)))
+        if len(constraint) > 1:
+            raise ValueError('a leg takes one constraint, got: {}'.format(', '.join(constraint)))
+        for kind in constraint:
+            if kind not in legConstraints[process]:
+                raise ValueError('an {} leg cannot be constrained by {} (expected one of {})'.format(
+                    process, kind, ', '.join(legConstraints[process])))
+        self.process = process
+        self.name = name
+        self.kind, self.value = next(iter(constraint.items())) if constraint else (None, None)
+
+    def parameter(self):
+        """
+        :return: the name of the cycle parameter the constraint uses (None for a number or no constraint)
+        """
+        if isinstance(self.value, str):
+            return self.value[2:] if self.value.startswith('1/') else self.value
+        return None
+
+    def key(self):
+        return (self.process, self.name, self.kind, self.value)
+
+class cycleDefinition():
+    def __init__(self, name, legs, defaults=None):
+        """
+        A declarative air standard cycle:  a closed sequence of legs (see cycleLeg) starting from state 1 at
+        t_initial and p_initial.  compile turns it into a compiledCycle that solves arrays of cases at once.
+        :param name: name of the cycle
+        :param legs: sequence of cycleLeg, the last one without a constraint
+        :param defaults: values of the cycle parameters when a solve leaves them out
+        """
+        self.name = name
+        self.legs = tuple(legs)
+        self.defaults = dict(cycleInputs)
+        self.defaults.update(defaults or {})
+        self.compiled = weakref.WeakKeyDictionary()  # compiledCycle per air object (see compile)
+
+    def parameters(self):
+        """
+        :return: the names of the parameters of the cycle, inputs first
+        """
+        names = list(cycleInputs)
+        for leg in self.legs:
+            if leg.parameter() is not None and leg.parameter() not in names:
+                names.append(leg.parameter())
+        return names
+
+    def compile(self, Air=None):
+        """
+        The evaluator of this cycle, compiled once per air object and then shared by every caller (it is dropped
+        with the air object).  The temperature inversions go through the air object's property tables if it has
+        them (see air.useTables); the state cache (air.useCache) is for single states and is not used.
+        :param Air: the air object to use (a shared one if None)
+        :return: a compiledCycle
+        """
+        a = Air if Air is not None else sharedAir()
+        compiled = self.compiled.get(a)
+        if compiled is None:
+            compiled = compiledCycle(self, a)
+            self.compiled[a] = compiled
+        return compiled
+
+    def solve(self, Air=None, **params):
+        """
+        Shorthand for compile(Air).solve(**params).
+        """
+        return self.compile(Air).solve(**params)
+
+_sharedAir = []
+
+def sharedAir():
+    """
+    :return: the air object cycles compile against when none is given
+    """
+    if not _sharedAir:
+        _sharedAir.append(air())
+    return _sharedAir[0]
+
+class compiledCycle():
+    def __init__(self, definition, Air):
+        """
+        Translates each leg of a cycleDefinition into a step function on arrays of (T, v), so solving goes straight
+        down the list of steps:  which formula a leg needs and where its constraint comes from are settled here,
+        once, not per solve.
+        The steps are handed the air object when they run rather than holding it, and the compiledCycle only keeps a
+        weak reference to it, so cycleDefinition.compiled does not keep air objects alive.
+        :param definition: the cycleDefinition
+        :param Air: the air object to use
+        """
+        legs = definition.legs
+        if len(legs) < 2:
+            raise ValueError('{}: a cycle needs at least two legs'.format(definition.name))
+        for i, leg in enumerate(legs):
+            if (leg.kind is None) != (i == len(legs)-1):
+                raise ValueError('{}: only the last leg (which returns to state 1) goes without a constraint'.format(
+                    definition.name))
+        self.definition = definition
+        self.airRef = weakref.ref(Air)
+        self.RBar = Air.RBar
+        self.legNames = [leg.name or '{}-{}'.format(i+1, i+2 if i < len(legs)-1 else 1) for i, leg in enumerate(legs)]
+        self.steps = [self.compileLeg(leg) for leg in legs[:-1]]
+        self.closing = legs[-1].process
+
+    @property
+    def Air(self):
+        return self.airRef()
+
+    #region compiling legs
+    def compileValue(self, value):
+        """
+        :return: a function of the parameter dictionary giving the constraint value
+        """
+        if not isinstance(value, str):
+            return lambda params: value
+        if value.startswith('1/'):
+            name = value[2:]
+            return lambda params: 1.0/params[name]
+        return lambda params: params[value]
+
+    def compileLeg(self, leg):
+        """
+        :return: a function (air object, T, v, v1, params) -> (T, v) at the end of the leg
+        """
+        RBar = self.RBar
+        get = self.compileValue(leg.value)
+        process, kind = leg.process, leg.kind
+        if process == 'isentropic':
+            # cv/T*dT=-Rbar*dv/v and cp/T*dT=Rbar*dP/P integrate in closed form (see air.isentropeT)
+            if kind in ('v', 'ratio'):
+                def step(A, T, v, v1, params):
+                    vEnd = get(params)*(v1 if kind == 'v' else v)
+                    return A.isentropeT(vEnd, T, v), vEnd
+            elif kind == 'T':
+                def step(A, T, v, v1, params):
+                    TEnd = get(params)
+                    return TEnd, v*np.exp((A.intCvOverT(T)-A.intCvOverT(TEnd))/RBar)
+            else:
+                def step(A, T, v, v1, params):
+                    PEnd = get(params)
+                    s0 = A.intCpOverT(T)-A.intCpOverT(A.StandardState.T)+RBar*np.log(PEnd*v/(RBar*T))
+                    TEnd = A.T_from('s0', np.asarray(s0, dtype=float))
+                    return TEnd, RBar*TEnd/PEnd
+        elif process == 'isochoric':
+            if kind == 'ratio':
+                def step(A, T, v, v1, params):
+                    return T*get(params), v
+            elif kind == 'T':
+                def step(A, T, v, v1, params):
+                    return get(params), v
+            else:
+                def step(A, T, v, v1, params):
+                    return get(params)*v/RBar, v
+        elif process == 'isobaric':
+            if kind in ('v', 'ratio'):
+                def step(A, T, v, v1, params):
+                    vEnd = get(params)*(v1 if kind == 'v' else v)
+                    return T*vEnd/v, vEnd
+            else:
+                def step(A, T, v, v1, params):
+                    TEnd = get(params)
+                    return TEnd, v*TEnd/T
+        else:
+            if kind in ('v', 'ratio'):
+                def step(A, T, v, v1, params):
+                    return T, get(params)*(v1 if kind == 'v' else v)
+            else:
+                def step(A, T, v, v1, params):
+                    return T, RBar*T/get(params)
+        return step
+    #endregion
+
+    def legEnergy(self, process, start, end):
+        """
+        Heat in and work out of a leg (molar, J/mol) from the first law q=du+w.
+        :param process: kind of leg
+        :param start: StateArray at the start of the leg
+        :param end: StateArray at the end of the leg
+        :return: (q, w)
+        """
+        du = end.u-start.u
+        if process == 'isentropic':
+            return np.zeros_like(du), -du
+        if process == 'isochoric':
+            return du, np.zeros_like(du)
+        if process == 'isobaric':
+            w = self.RBar*(end.T-start.T)  # P*dv
+            return du+w, w
+        w = self.RBar*start.T*np.log(end.v/start.v)
+        return w, w
+
+    def checkClosed(self, last, first, rtol=1e-6):
+        """
+        Raises ValueError unless the last leg can get from the last state back to state 1.
+        """
+        col = {'isentropic': 's', 'isochoric': 'v', 'isobaric': 'P', 'isothermal': 'T'}[self.closing]
+        a, b = getattr(last, col), getattr(first, col)
+        scale = np.abs(b) if col != 's' else self.RBar
+        if not np.all(np.abs(a-b) <= rtol*scale):
+            raise ValueError('{}: the {} leg {} does not close the cycle ({} of the last state is not that of '
+                             'state 1)'.format(self.definition.name, self.closing, self.legNames[-1], col))
+
+    def solve(self, **params):
+        """
+        Solves the cycle for arrays of parameters at once (they broadcast against each other, e.g., ratio[:, None]
+        and t_high[None, :] for a grid).  Nothing here needs Qt.
+        :param params: the parameters of the cycle (see cycleDefinition.parameters), in SI units
+        :return: dictionary of arrays:  State1-StateN (StateArray, molar), Q_Legs and W_Legs (lists of the heat in
+                 and work out of each leg in J/mol, in the order of legNames), Q_In, Q_Out (heat rejected, positive),
+                 W_Cycle (J/mol), Eff (%) and n (moles of air in the cylinder)
+        """
+        unknown = set(params)-set(self.definition.parameters())
+        if unknown:
+            raise ValueError('{}: unknown parameters {}'.format(self.definition.name, ', '.join(sorted(unknown))))
+        values = dict(self.definition.defaults)
+        values.update(params)
+        missing = [name for name in self.definition.parameters() if name not in values]
+        if missing:
+            raise ValueError('{}: missing parameters {}'.format(self.definition.name, ', '.join(missing)))
+        names = list(values)
+        arrays = np.broadcast_arrays(*[np.asarray(values[name], dtype=float) for name in names])
+        values = dict(zip(names, arrays))
+
+        A = self.Air
+        if A is None:
+            raise ValueError('{}: the air object this cycle was compiled against is gone; compile it again'.format(
+                self.definition.name))
+        T = values['t_initial']
+        v = A.RBar*T/values['p_initial']
+        v1 = v
+        Ts, vs = [T], [v]
+        for step in self.steps:
+            T, v = step(A, T, v, v1, values)
+            Ts.append(np.broadcast_to(T, v1.shape))
+            vs.append(np.broadcast_to(v, v1.shape))
+        # every state at once:  one set_many call on the states stacked along a new first axis
+        states = A.set_many(T=np.stack(Ts), v=np.stack(vs))
+        states = [StateArray(*[col[i] for col in states], name='State{}'.format(i+1)) for i in range(len(Ts))]
+        self.checkClosed(states[-1], states[0])
+
+        Q, W = [], []
+        for i, leg in enumerate(self.definition.legs):
+            q, w = self.legEnergy(leg.process, states[i], states[(i+1) % len(states)])
+            Q.append(q)
+            W.append(w)
+        Q_In = sum(np.maximum(q, 0.0) for q in Q)
+        Q_Out = -sum(np.minimum(q, 0.0) for q in Q)
+        W_Cycle = sum(W)
+        results = {st.name: st for st in states}
+        results.update({'Q_Legs': Q, 'W_Legs': W, 'Q_In': Q_In, 'Q_Out': Q_Out, 'W_Cycle': W_Cycle,
+                        'Eff': 100.0*W_Cycle/Q_In, 'n': values['v_cylinder']/v1})
+        return results
+
+#region cycle definitions
+ottoCycle = cycleDefinition('Otto', [
+    cycleLeg('isentropic', ratio='1/ratio'),  # compression
+    cycleLeg('isochoric', T='t_high'),  # heat addition
+    cycleLeg('isentropic', v=1.0),  # expansion
+    cycleLeg('isochoric')],  # heat rejection
+    defaults={'ratio': 6.0, 't_high': 1500.0})
+
+dieselCycle = cycleDefinition('Diesel', [
+    cycleLeg('isentropic', ratio='1/ratio'),  # compression
+    cycleLeg('isobaric', ratio='cutoff'),  # heat addition (cutoff ratio V3/V2)
+    cycleLeg('isentropic', v=1.0),  # expansion
+    cycleLeg('isochoric')],  # heat rejection
+    defaults={'ratio': 18.0, 'cutoff': 2.0})
+
+dualCycle = cycleDefinition('Dual', [
+    cycleLeg('isentropic', ratio='1/ratio'),  # compression
+    cycleLeg('isochoric', ratio='pressure_ratio'),  # heat addition at constant volume (P3/P2)
+    cycleLeg('isobaric', ratio='cutoff'),  # heat addition at constant pressure (V4/V3)
+    cycleLeg('isentropic', v=1.0),  # expansion
+    cycleLeg('isochoric')],  # heat rejection
+    defaults={'ratio': 16.0, 'pressure_ratio': 1.5, 'cutoff': 1.5})
+#endregion
+
+def main():
+    ratio = np.linspace(10.0, 22.0, 1000)
+    cutoff = np.linspace(1.1, 3.0, 1000)
+    for cycle, params in ((ottoCycle, {'ratio': ratio[:, None], 't_high': 1000.0+cutoff[None, :]*500.0}),
+                          (dieselCycle, {'ratio': ratio[:, None], 'cutoff': cutoff[None, :]}),
+                          (dualCycle, {'ratio': ratio[:, None], 'cutoff': cutoff[None, :]})):
+        t = time.time()
+        r = cycle.solve(t_initial=300.0, p_initial=101325.0, **params)
+        print('{}: {} cycles in {:0.2f} s, efficiency from {:0.2f}% to {:0.2f}%'.format(
+            cycle.name, r['Eff'].size, time.time()-t, r['Eff'].min(), r['Eff'].max()))
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,86 @@
 from Air import *
+import copy
 from matplotlib import pyplot as plt
 from PyQt5 import QtWidgets as qtw
 import sys
 
+class dependencyGraph():
+    """
+    A small dependency graph for the quantities of a model.  Inputs are plain attributes of the model.  Each node
+    names the inputs/nodes it depends on and the method of the model that (re)calculates it.  Changing an input
+    marks everything downstream of it dirty, and update() recalculates only the dirty nodes, in dependency order.
+    The graph only holds names (not the model), so a model can be copied together with its graph.
+    """
+    def __init__(self):
+        self.inputs = set()
+        self.nodes = {}  # node name -> (names it depends on, name of the model method that calculates it)
+        self.order = []  # node names in an order where every node comes after what it depends on
+        self.dirty = set()
+
+    def addInput(self, name):
+        self.inputs.add(name)
+
+    def addNode(self, name, dependsOn, calcName):
+        """
+        Adds a node.  Nodes must be added after the nodes they depend on.
+        :param name: node name
+        :param dependsOn: names of the inputs and nodes it depends on
+        :param calcName: name of the model method that calculates it
+        """
+        self.nodes[name] = (tuple(dependsOn), calcName)
+        self.order.append(name)
+        self.dirty.add(name)
+
+    def setInput(self, model, name, value):
+        """
+        Sets an input on the model and, if its value changed, invalidates everything that depends on it.
+        :return: True if the value changed
+        """
+        if name in self.inputs and getattr(model, name, None) == value:
+            return False
+        setattr(model, name, value)
+        self.invalidate(name)
+        return True
+
+    def invalidate(self, name):
+        """
+        Marks every node downstream of name (and name itself if it is a node) dirty.
+        """
+        stale = {name}
+        for node in self.order:
+            if node in stale or any(dep in stale for dep in self.nodes[node][0]):
+                stale.add(node)
+                self.dirty.add(node)
+
+    def update(self, model, progress=None, cancelled=None):
+        """
+        Recalculates the dirty nodes in dependency order.
+        :param progress: optional callback progress(nodes done, nodes to do) called before each node and at the end
+        :param cancelled: optional callback, stops the update (leaving the rest dirty) once it returns True
+        :return: names of the nodes that were recalculated
+        """
+        todo = [node for node in self.order if node in self.dirty]
+        done = []
+        for node in todo:
+            if cancelled is not None and cancelled():
+                return done
+            if progress is not None:
+                progress(len(done), len(todo))
+            getattr(model, self.nodes[node][1])()
+            self.dirty.discard(node)
+            done.append(node)
+        if progress is not None:
+            progress(len(done), len(todo))
+        return done
+
+    def copy(self):
+        """
+        A copy with its own dirty set (the structure of the graph is shared).
+        """
+        g = copy.copy(self)
+        g.dirty = set(self.dirty)
+        return g
+
 class ottoCycleModel():
     def __init__(self, p_initial=1000.0, v_cylinder=1.0, t_initial=298, t_high=1500.0, ratio=6.0, name='Air Standard Otto Cycle'):
         """
@@ -31,33 +109,251 @@ class ottoCycleModel():
         """
         self.units=units()
         self.air = air()  # the working fluid
-        self.air.set(P=p_initial, T=t_initial)  # initial state if fixed at p_initial, t_initial
+        self.air.useCache()  # recalculating with the same inputs reuses the states
         self.p_initial=p_initial
         self.T_initial=t_initial
         self.T_high=t_high
         self.Ratio=ratio  # the compression ratio V_BDC/V_TDC
         self.V_Cylinder=v_cylinder
-        self.air.n=self.V_Cylinder/self.air.State.v  # calcualte number of moles of air
-        self.air.m=self.air.n*self.air.MW
-
-        self.State1=self.air.set(P=self.p_initial, T=self.T_initial)
-        self.State2=self.air.set(v=self.State1.v/self.Ratio, s=self.State1.s)
-        self.State3=self.air.set(T=self.T_high, v=self.State2.v)
-        self.State4=self.air.set(v=self.State1.v, s=self.State3.s)
-        
-        self.W_Compression = self.air.n*(self.State2.u-self.State1.u)
-        self.W_Power = self.air.n*(self.State3.u-self.State3.u)
-        self.Q_In = self.air.n*(self.State3.u-self.State2.u)
-        self.Q_Out = self.air.n*(self.State4.u-self.State1.u)
-        
-        self.W_Cycle=self.W_Power-self.W_Compression
-        self.Eff=self.W_Cycle/self.Q_In
 
         self.upperCurve=StateDataForPlotting()
         self.lowerCurve=StateDataForPlotting()
+        self.nPointsPerLeg=None  # points on each of the four process curves (None to sample them adaptively)
+        self.curveTolerance=1e-3  # adaptive sampling:  allowed deviation from straight segments (fraction of plot range)
+        self.maxPointsPerLeg=200  # adaptive sampling:  most points on a process curve
+        self.plotColumns={}  # converted plot data, see getPlotColumn
+
+        #region dependency graph of the cycle quantities (see dependencyGraph)
+        # e.g., changing T_high leaves State1, State2 and n alone
+        self.graph=dependencyGraph()
+        for name in ('p_initial', 'T_initial', 'T_high', 'Ratio', 'V_Cylinder',
+                     'nPointsPerLeg', 'curveTolerance', 'maxPointsPerLeg'):
+            self.graph.addInput(name)
+        self.graph.addNode('State1', ('p_initial', 'T_initial'), 'calcState1')
+        self.graph.addNode('State2', ('State1', 'Ratio'), 'calcState2')
+        self.graph.addNode('State3', ('State2', 'T_high'), 'calcState3')
+        self.graph.addNode('State4', ('State1', 'State3'), 'calcState4')
+        self.graph.addNode('n', ('State1', 'V_Cylinder'), 'calcMoles')
+        self.graph.addNode('energy', ('State1', 'State2', 'State3', 'State4'), 'calcEnergy')
+        self.graph.addNode('curves', ('State1', 'State2', 'State3', 'State4',
+                                      'nPointsPerLeg', 'curveTolerance', 'maxPointsPerLeg'), 'buildCurves')
+        self.graph.addNode('plotColumns', ('curves', 'n'), 'clearPlotColumns')
+        #endregion
+        self.update()
 
     def getSI(self):
         return self.units.SI
+
+    def setInputs(self, **inputs):
+        """
+        Sets any of p_initial, T_initial, T_high, Ratio, V_Cylinder, nPointsPerLeg, curveTolerance and
+        maxPointsPerLeg (SI units) and marks what
+        depends on the changed ones for recalculation by update().
+        :return: list of the inputs whose value changed
+        """
+        return [name for name, value in inputs.items() if self.graph.setInput(self, name, value)]
+
+    def update(self, progress=None, cancelled=None):
+        """
+        Recalculates only the cycle quantities that changed inputs invalidated.
+        :param progress: optional callback progress(done, todo) (see dependencyGraph.update)
+        :param cancelled: optional callback that stops the update once it returns True
+        :return: names of the quantities that were recalculated
+        """
+        return self.graph.update(self, progress=progress, cancelled=cancelled)
+
+    def copy(self):
+        """
+        A copy to recalculate in another thread while this one is on display.  The copy shares the property cache and
+        tables of the air (both thread safe) and the states (which are replaced, never changed), but nothing that
+        recalculating changes in place.
+        """
+        c = copy.copy(self)
+        c.air = copy.copy(self.air)
+        c.units = copy.copy(self.units)
+        c.graph = self.graph.copy()
+        c.upperCurve = StateDataForPlotting().append(self.upperCurve)
+        c.lowerCurve = StateDataForPlotting().append(self.lowerCurve)
+        c.plotColumns = dict(self.plotColumns)
+        return c
+
+    #region calculations of the nodes in the dependency graph.  All state calculations are for molar values.
+    def calcState1(self):
+        self.State1=self.air.set(P=self.p_initial, T=self.T_initial, name='State 1 - BDC')
+
+    def calcState2(self):
+        self.State2=self.air.set(v=self.State1.v/self.Ratio, s=self.State1.s, name='State 2 - TDC')
+
+    def calcState3(self):
+        self.State3=self.air.set(T=self.T_high, v=self.State2.v, name='State 3 - TDC')
+
+    def calcState4(self):
+        self.State4=self.air.set(v=self.State1.v, s=self.State3.s, name='State 4 - BDC')
+
+    def calcMoles(self):
+        self.air.n=self.V_Cylinder/self.State1.v  # calcualte number of moles of air
+        self.air.m=self.air.n*self.air.MW
+
+    def calcEnergy(self):
+        self.W_Compression = self.State2.u - self.State1.u
+        self.W_Power = self.State3.u - self.State4.u
+        self.Q_In = self.State3.u - self.State2.u
+        self.Q_Out = self.State4.u - self.State1.u
+
+        self.W_Cycle = self.W_Power - self.W_Compression
+        self.Eff = 100.0*self.W_Cycle / self.Q_In
+    #endregion
+
+    def clearPlotColumns(self):
+        self.plotColumns.clear()
+
+    def getPlotColumn(self, curve='upper', colName='T', mass=False, total=False):
+        """
+        A column of plot data converted to the current units.  Columns are converted on first use and cached until
+        the cycle changes (the plotColumns node of the dependency graph), so changing axes, log scales or units
+        back and forth never converts the same data twice.
+        :param curve: 'upper' (upperCurve), 'lower' (lowerCurve) or 'states' (State1-State4 for the markers)
+        :param colName: letter of the property (T, P, h, u, s, v)
+        :param mass: per unit mass
+        :param total: extensive values (ignored if mass is True)
+        :return: numpy array (read only, it is shared by everyone who asks)
+        """
+        w=colName.lower()
+        w={'t': 'T', 'p': 'P'}.get(w, w)
+        key=(curve, w, self.units.SI, mass, total)
+        data=self.plotColumns.get(key)
+        if data is None:
+            if curve == 'states':
+                raw=np.array([S.getVal(w) for S in (self.State1, self.State2, self.State3, self.State4)])
+            else:
+                raw=(self.upperCurve if curve == 'upper' else self.lowerCurve).getDataCol(w)
+            CF=conversionFactors(SI=self.units.SI, mass=mass, total=total, n=self.air.n, MW=self.air.MW, Units=self.units)
+            data=raw*CF[w]
+            data.flags.writeable=False
+            self.plotColumns[key]=data
+        return data
+
+    def buildCurves(self, nPoints=None):
+        """
+        Calculates the states along all four processes in one batch:
+        1-2 and 3-4 are isentropes (v from BDC to TDC and back), 2-3 and 4-1 are constant volume.
+        The isentrope temperatures come from one vectorized inversion and every state from one air.set_many call.
+        upperCurve gets 2-3, 3-4, 4-1 and lowerCurve gets 1-2.
+        :param nPoints: points on each process curve (defaults to self.nPointsPerLeg, None samples adaptively)
+        :return: none
+        """
+        n = self.nPointsPerLeg if nPoints is None else nPoints
+        if n is None:
+            return self.buildCurvesAdaptive()
+        S1, S2, S3, S4 = self.State1, self.State2, self.State3, self.State4
+        v12 = np.linspace(S1.v, S2.v, n)
+        v34 = np.linspace(S3.v, S4.v, n)
+        TIsentropes = self.air.isentropeT(np.concatenate((v12, v34)), np.repeat([S1.T, S3.T], n), np.repeat([S1.v, S3.v], n))
+        T = np.concatenate((np.linspace(S2.T, S3.T, n), TIsentropes[n:], np.linspace(S4.T, S1.T, n), TIsentropes[:n]))
+        v = np.concatenate((np.full(n, S2.v), v34, np.full(n, S4.v), v12))
+        states = self.air.set_many(T=T, v=v)
+        self.upperCurve.clear()
+        self.upperCurve.append(states[:3*n])
+        self.lowerCurve.clear()
+        self.lowerCurve.append(states[3*n:])
+
+    #region adaptive sampling of the process curves
+    # the legs in plotting order (upperCurve is 2-3, 3-4, 4-1 and lowerCurve is 1-2):  (first state, last state, isentropic)
+    legs = ((2, 3, False), (3, 4, True), (4, 1, False), (1, 2, True))
+
+    def legStates(self, leg, t):
+        """
+        States along the legs of the cycle in one batch.  Constant volume legs are linear in T, isentropes in ln(v).
+        :param leg: index into legs of each point
+        :param t: fraction of the way along its leg of each point (0 at the first state, 1 at the last)
+        :return: a StateArray
+        """
+        S = (None, self.State1, self.State2, self.State3, self.State4)
+        leg = np.asarray(leg)
+        t = np.asarray(t, dtype=float)
+        TA, TB, vA, vB = [np.array([getattr(S[l[i]], p) for l in self.legs])[leg] for p, i in (('T', 0), ('T', 1), ('v', 0), ('v', 1))]
+        isentropic = np.array([l[2] for l in self.legs])[leg]
+        T = TA+t*(TB-TA)
+        v = vA*(vB/vA)**t  # stays put on the constant volume legs
+        T[isentropic] = self.air.isentropeT(v[isentropic], TA[isentropic], vA[isentropic])
+        return self.air.set_many(T=T, v=v)
+
+    def plotSpace(self, states):
+        """
+        Scales the properties of states to the range they cover over the cycle, so a distance of 1 spans a whole
+        plot axis.  P and v are in twice, linear and as ln (the view plots them on linear or log axes).
+        :return: numpy array with a row per state and a column per property (T, P, u, h, s, v, ln P, ln v)
+        """
+        X = []
+        for p, scale in [(p, None) for p in StateArray.columns]+[('P', np.log), ('v', np.log)]:
+            ends = np.array([getattr(S, p) for S in (self.State1, self.State2, self.State3, self.State4)])
+            data = getattr(states, p)
+            if scale is not None:
+                ends, data = scale(ends), scale(data)
+            span = ends.max()-ends.min()
+            X.append((data-ends.min())/(span if span > 0.0 else 1.0))
+        return np.column_stack(X)
+
+    def buildCurvesAdaptive(self, tol=None, maxPoints=None):
+        """
+        Samples the four processes where they bend instead of at even spacing.  Each leg starts from a few even
+        points.  Pass after pass, the midpoints of all the unsettled intervals are calculated in one batch, and a
+        midpoint is kept (and both halves of its interval refined further) if it lies more than tol/2 off the
+        chord of its interval.  Distances are measured in plotSpace, and as the distance over all its columns
+        bounds the distance on any pair of them, this holds on linear and log axes alike.  The midpoint is not
+        always the farthest point of an interval from its chord (up to ~tol on the isentropes on linear P-v
+        axes), hence tol/2:  the curves are then good to tol on the axes the view picks.
+        :param tol: allowed deviation from straight segments as a fraction of the plot range (default self.curveTolerance)
+        :param maxPoints: most points on a leg, the worst intervals are split first (default self.maxPointsPerLeg)
+        :return: none
+        """
+        tol = self.curveTolerance if tol is None else tol
+        maxPoints = self.maxPointsPerLeg if maxPoints is None else maxPoints
+        nLegs, nStart = len(self.legs), 5
+        leg = np.repeat(np.arange(nLegs), nStart)
+        t = np.tile(np.linspace(0.0, 1.0, nStart), nLegs)
+        states = self.legStates(leg, t)
+        X = self.plotSpace(states)
+        count = np.full(nLegs, nStart)
+        legs, ts, curves = [leg], [t], [states]
+
+        # the unsettled intervals
+        first = np.flatnonzero(leg[:-1] == leg[1:])
+        legI, tA, tB, XA, XB = leg[first], t[first], t[first+1], X[first], X[first+1]
+        while len(legI) > 0:
+            tM = 0.5*(tA+tB)
+            SM = self.legStates(legI, tM)
+            XM = self.plotSpace(SM)
+            # distance of each midpoint from the chord of its interval
+            d, e = XM-XA, XB-XA
+            f = np.clip(np.einsum('ij,ij->i', d, e)/np.maximum(np.einsum('ij,ij->i', e, e), 1e-300), 0.0, 1.0)
+            err = np.linalg.norm(d-f[:, None]*e, axis=1)
+            # split the intervals that are off by more than tol, worst first on each leg, up to maxPoints per leg
+            order = np.lexsort((-err, legI))
+            rank = np.arange(len(order))-np.searchsorted(legI[order], legI[order])
+            split = np.zeros(len(legI), dtype=bool)
+            split[order] = (err[order] > 0.5*tol) & (count[legI[order]]+rank < maxPoints)
+            count += np.bincount(legI[split], minlength=nLegs)
+            legs.append(legI[split])
+            ts.append(tM[split])
+            curves.append(SM[split])
+            # both halves of each split interval are unsettled
+            legI = np.tile(legI[split], 2)
+            tA, tB = np.concatenate((tA[split], tM[split])), np.concatenate((tM[split], tB[split]))
+            XA, XB = np.concatenate((XA[split], XM[split])), np.concatenate((XM[split], XB[split]))
+
+        # put the points of each leg in order
+        leg, t = np.concatenate(legs), np.concatenate(ts)
+        states = StateArray()
+        for S in curves:
+            states.append(S)
+        states = states[np.lexsort((t, leg))]
+        nUpper = int(np.count_nonzero(leg < 3))
+        self.upperCurve.clear()
+        self.upperCurve.append(states[:nUpper])
+        self.lowerCurve.clear()
+        self.lowerCurve.append(states[nUpper:])
+    #endregion
     
 class ottoCycleController():
     def __init__(self, model=None, ax=None):
@@ -67,15 +363,20 @@ class ottoCycleController():
 
     #region Functions that operate on the model (i.e., change model state)
     def calc(self):
-        # read values from the GUI
-        t0=self.view.le_TLow.text()
+        self.set(**self.readInputs())
+
+    def readInputs(self):
+        """
+        Reads values from the GUI.
+        :return: dictionary of the arguments of set
+        """
         T0=float(self.view.le_TLow.text())
         P0=float(self.view.le_P0.text())
         V0=float(self.view.le_V0.text())
         TH=float(self.view.le_THigh.text())
         CR=float(self.view.le_CR.text())
         metric=self.view.rdo_Metric.isChecked()
-        self.set(T_0=T0, P_0=P0, V_0=V0, T_High=TH, ratio=CR, SI=metric)
+        return dict(T_0=T0, P_0=P0, V_0=V0, T_High=TH, ratio=CR, SI=metric)
 
     def set(self, T_0=25.0, P_0=100.0, V_0=1.0, T_High=1500.0, ratio=6.0, SI=True):
         """
@@ -88,73 +389,37 @@ class ottoCycleController():
         :param SI: boolean
         :return: none
         """
-        self.model.units.set(SI=SI)
-        self.model.T_initial=T_0 if SI else T_0/self.model.units.CF_T
-        self.model.p_initial=P_0 if SI else P_0/self.model.units.CF_P
-        self.model.T_high=T_High if SI else T_High/self.model.units.CF_T
-        self.model.V_Cylinder=V_0 if SI else V_0/self.model.units.CF_V
-        self.model.Ratio=ratio
-
-        #note that all state calculations are for molar values
-        self.model.State1=self.model.air.set(P=self.model.p_initial, T=self.model.T_initial, name='State 1 - BDC')
-        self.model.State2=self.model.air.set(v=self.model.State1.v/self.model.Ratio, s=self.model.State1.s, name='State 2 - TDC')
-        self.model.State3=self.model.air.set(T=self.model.T_high, v=self.model.State2.v, name='State 3 - TDC')
-        self.model.State4=self.model.air.set(v=self.model.State1.v, s=self.model.State3.s, name='State 4 - BDC')
-
-        self.model.air.n=self.model.V_Cylinder/self.model.air.State.v  # calcualte number of moles of air
-        self.model.air.m=self.model.air.n*self.model.air.MW
-
-        self.model.W_Compression = self.model.State2.u - self.model.State1.u
-        self.model.W_Power = self.model.State3.u - self.model.State4.u
-        self.model.Q_In = self.model.State3.u - self.model.State2.u
-        self.model.Q_Out = self.model.State4.u - self.model.State1.u
-
-        self.model.W_Cycle = self.model.W_Power - self.model.W_Compression
-        self.model.Eff = 100.0*self.model.W_Cycle / self.model.Q_In
-
-        self.buildDataForPlotting()
+        self.setInputs(self.model, T_0=T_0, P_0=P_0, V_0=V_0, T_High=T_High, ratio=ratio, SI=SI)
+        # only what the changed inputs invalidate is recalculated (see ottoCycleModel.update)
+        self.model.update()
         self.updateView()
 
-    def buildDataForPlotting(self ):
+    def setInputs(self, model, T_0=25.0, P_0=100.0, V_0=1.0, T_High=1500.0, ratio=6.0, SI=True):
+        """
+        Converts the inputs (arguments as for set) to SI and sets them on a model without recalculating it, e.g.,
+        on a copy of the model to be recalculated in a worker thread.
+        :return: none
+        """
+        model.units.set(SI=SI)
+        model.setInputs(T_initial=T_0 if SI else T_0/model.units.CF_T,
+                        p_initial=P_0 if SI else P_0/model.units.CF_P,
+                        T_high=T_High if SI else T_High/model.units.CF_T,
+                        V_Cylinder=V_0 if SI else V_0/model.units.CF_V,
+                        Ratio=ratio)
+
+    def buildDataForPlotting(self, nPoints=None):
         """
         I want to create state data between states 1-2, 2-3, 3-4, 4-1
         I'll piece together an upperCurve data set from 2-3, 3-4, 4-1
         The lowerCurve data set is 1-2
+        All four processes are calculated in one batch by the model (see ottoCycleModel.buildCurves).
+        :param nPoints: points on each process curve (defaults to model.nPointsPerLeg)
         :return:
         """
-        # clear out any old data
-        self.model.upperCurve.clear()
-        self.model.lowerCurve.clear()
-        a = air()  # an air object
-        #region build upperCurve
-        # region states from 2-3 (v=const, T from T2->T3)
-        DeltaT=np.linspace(self.model.State2.T, self.model.State3.T, 30)
-        for T in DeltaT:
-            state = a.set(T=T, v=self.model.State2.v)
-            self.model.upperCurve.add((state.T, state.P, state.u, state.h, state.s, state.v))
-        # endregion
-        # region states from 3-4 (v=from TDC to BDC, s=const.)
-        DeltaV = np.linspace(self.model.State3.v, self.model.State4.v, 30)
-        for v in DeltaV:
-            state = a.set(v=v, s=self.model.State3.s)
-            self.model.upperCurve.add((state.T, state.P, state.u, state.h, state.s, state.v))
-        # endregion
-        # region states from 4-1 (v=const, T from T4->T1)
-        DeltaT=np.linspace(self.model.State4.T, self.model.State1.T, 30)
-        for T in DeltaT:
-            state = a.set(T=T, v=self.model.State4.v)
-            self.model.upperCurve.add((state.T, state.P, state.u, state.h, state.s, state.v))
-        # endregion
-        #endregion
-
-        #region build lowerCurve
-        # region states from 1-2 (v=from BDC to TDC, s=const.)
-        DeltaV=np.linspace(self.model.State1.v, self.model.State2.v, 30)
-        for v in DeltaV:
-            state = a.set(v=v, s=self.model.State1.s)
-            self.model.lowerCurve.add((state.T, state.P, state.u, state.h, state.s, state.v))
-        # endregion
-        #endregion
+        if nPoints is not None:
+            self.model.setInputs(nPointsPerLeg=nPoints)
+        self.model.graph.invalidate('curves')
+        self.model.update()
     #endregion
 
     # region Functions that operate on the view
@@ -221,6 +486,8 @@ class ottoCycleView():
         self.canvas=None
         self.ax=None
         #endregion
+        self.reuseArtists=False  # opt in to persistent artists and blitting on the Qt canvas (see plot_cycle_XY_artists)
+        self.artists=None
 
     def updateView(self, cycle):
         cycle.units.SI=self.rdo_Metric.isChecked()
@@ -305,6 +572,8 @@ class ottoCycleView():
         if self.ax == None:
             self.ax = plt.subplot()
             QTPlotting = False  # actually, we are just using CLI and showing the plot
+        if QTPlotting and self.reuseArtists:
+            return self.plot_cycle_XY_artists(cycle, X=X, Y=Y, logx=logx, logy=logy, mass=mass, total=total)
 
         ax = self.ax
         ax.clear()
@@ -312,11 +581,11 @@ class ottoCycleView():
         ax.set_xscale('log' if logx else 'linear')
         ax.set_yscale('log' if logy else 'linear')
 
-        # plot the upper and lower curves
-        XdataLC=self.convertDataCol(cycle, colName=X,data=cycle.lowerCurve.getDataCol(X), mass=mass, total=total)
-        YdataLC=self.convertDataCol(cycle, colName=Y,data=cycle.lowerCurve.getDataCol(Y), mass=mass, total=total)
-        XdataUC=self.convertDataCol(cycle, colName=X,data=cycle.upperCurve.getDataCol(X), mass=mass, total=total)
-        YdataUC=self.convertDataCol(cycle, colName=Y,data=cycle.upperCurve.getDataCol(Y), mass=mass, total=total)
+        # plot the upper and lower curves (converted columns are cached by the cycle)
+        XdataLC=cycle.getPlotColumn('lower', X, mass=mass, total=total)
+        YdataLC=cycle.getPlotColumn('lower', Y, mass=mass, total=total)
+        XdataUC=cycle.getPlotColumn('upper', X, mass=mass, total=total)
+        YdataUC=cycle.getPlotColumn('upper', Y, mass=mass, total=total)
         ax.plot(XdataLC, YdataLC, color='k')
         ax.plot(XdataUC, YdataUC, color='g')
 
@@ -333,24 +602,15 @@ class ottoCycleView():
         ax.tick_params(axis='both', which='both', direction='in', top=True, right=True,labelsize='large')
 
         # plot the circles for states 1, 2, 3, and 4
-        state1=dc(cycle.State1)
-        state1.ConvertStateData(SI=cycle.getSI(), Units=cycle.units, n=cycle.air.n, MW=cycle.air.MW, mass=mass, total=total)
-        state2=dc(cycle.State2)
-        state2.ConvertStateData(SI=cycle.getSI(), Units=cycle.units, n=cycle.air.n, MW=cycle.air.MW, mass=mass, total=total)
-        state3=dc(cycle.State3)
-        state3.ConvertStateData(SI=cycle.getSI(), Units=cycle.units, n=cycle.air.n, MW=cycle.air.MW, mass=mass, total=total)
-        state4=dc(cycle.State4)
-        state4.ConvertStateData(SI=cycle.getSI(), Units=cycle.units, n=cycle.air.n, MW=cycle.air.MW, mass=mass, total=total)
-
-        ax.plot(state1.getVal(X), state1.getVal(Y), marker='o', markerfacecolor='w', markeredgecolor='k')
-        ax.plot(state2.getVal(X), state2.getVal(Y), marker='o', markerfacecolor='w', markeredgecolor='k')
-        ax.plot(state3.getVal(X), state3.getVal(Y), marker='o', markerfacecolor='w', markeredgecolor='k')
-        ax.plot(state4.getVal(X), state4.getVal(Y), marker='o', markerfacecolor='w', markeredgecolor='k')
+        XdataS=cycle.getPlotColumn('states', X, mass=mass, total=total)
+        YdataS=cycle.getPlotColumn('states', Y, mass=mass, total=total)
+        for x, y in zip(XdataS, YdataS):
+            ax.plot(x, y, marker='o', markerfacecolor='w', markeredgecolor='k')
         # # set limits on x and y
-        xmin = min(min(cycle.upperCurve.getDataCol(X)), min(cycle.lowerCurve.getDataCol(X)))
-        xmax = max(max(cycle.upperCurve.getDataCol(X)), max(cycle.lowerCurve.getDataCol(X)))
-        ymin=min(min(cycle.upperCurve.getDataCol(Y)), min(cycle.lowerCurve.getDataCol(Y)))
-        ymax=max(max(cycle.upperCurve.getDataCol(Y)), max(cycle.lowerCurve.getDataCol(Y)))
+        xmin = min(XdataUC.min(), XdataLC.min())
+        xmax = max(XdataUC.max(), XdataLC.max())
+        ymin = min(YdataUC.min(), YdataLC.min())
+        ymax = max(YdataUC.max(), YdataLC.max())
         #ax.set_xlim(xmin,xmax)
         #ax.set_ylim(ymin,ymax)
         deltax=xmax-xmin
@@ -363,6 +623,84 @@ class ottoCycleView():
         else:
             self.canvas.draw()
 
+    #region persistent artists
+    def plot_cycle_XY_artists(self, cycle, X='s', Y='T', logx=False, logy=False, mass=False, total=False):
+        """
+        plot_cycle_XY on the Qt canvas without rebuilding the plot.  The curve and state marker artists are made once
+        and updated with set_data.  The axes are only restyled when X, Y, the log scales or the units change, and
+        if the autoscaled limits come out the same as before only the artists are drawn over the saved background
+        and blitted.  Otherwise the figure is drawn once (which saves a new background, see onCanvasDraw).
+        :param X: letter for which variable to plot on X axis
+        :param Y: letter for which variable to plot on Y axis
+        :return:
+        """
+        ax = self.ax
+        A = self.artists
+        if A is None or A['ax'] is not ax or A['lower'] not in ax.lines:
+            A = self.artists = self.createCycleArtists(ax)
+
+        # update the data of the upper and lower curves and the circles for states 1, 2, 3, and 4
+        A['lower'].set_data(cycle.getPlotColumn('lower', X, mass=mass, total=total),
+                            cycle.getPlotColumn('lower', Y, mass=mass, total=total))
+        A['upper'].set_data(cycle.getPlotColumn('upper', X, mass=mass, total=total),
+                            cycle.getPlotColumn('upper', Y, mass=mass, total=total))
+        A['states'].set_data(cycle.getPlotColumn('states', X, mass=mass, total=total),
+                             cycle.getPlotColumn('states', Y, mass=mass, total=total))
+
+        layout = (X, Y, logx, logy, cycle.units.SI, mass, total)
+        redraw = layout != A['layout'] or A['background'] is None
+        if layout != A['layout']:
+            A['layout'] = layout
+            ax.set_xscale('log' if logx else 'linear')
+            ax.set_yscale('log' if logy else 'linear')
+            cycle.units.setPlotUnits(SI=cycle.units.SI, mass=mass, total=total)
+            ax.set_ylabel(cycle.lowerCurve.getAxisLabel(Y, Units=cycle.units), fontsize='large')
+            ax.set_xlabel(cycle.lowerCurve.getAxisLabel(X, Units=cycle.units), fontsize='large')
+
+        # rescale to the new data, a full draw is only needed if that moved the limits
+        limits = (ax.get_xlim(), ax.get_ylim())
+        ax.relim()
+        ax.autoscale_view()
+        if redraw or limits != (ax.get_xlim(), ax.get_ylim()):
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(A['background'])
+            self.drawCycleArtists()
+            self.canvas.blit(ax.bbox)
+
+    def createCycleArtists(self, ax):
+        """
+        Clears the axes and makes the (animated) artists plot_cycle_XY_artists updates.
+        :return: dictionary of the artists and the state of the plot
+        """
+        if self.artists is not None:
+            self.canvas.mpl_disconnect(self.artists['cid'])
+        ax.clear()
+        ax.set_title('Otto Cycle', fontsize='large')
+        ax.tick_params(axis='both', which='both', direction='in', top=True, right=True, labelsize='large')
+        A = {'ax': ax, 'layout': None, 'background': None}
+        A['lower'], = ax.plot([], [], color='k', animated=True)
+        A['upper'], = ax.plot([], [], color='g', animated=True)
+        A['states'], = ax.plot([], [], linestyle='none', marker='o', markerfacecolor='w', markeredgecolor='k', animated=True)
+        A['cid'] = self.canvas.mpl_connect('draw_event', self.onCanvasDraw)
+        return A
+
+    def onCanvasDraw(self, event):
+        """
+        After every full draw (including resizes) saves the background of the axes and draws the artists on it.
+        """
+        A = self.artists
+        if A is None:
+            return
+        A['background'] = self.canvas.copy_from_bbox(A['ax'].bbox)
+        self.drawCycleArtists()
+
+    def drawCycleArtists(self):
+        A = self.artists
+        for name in ('lower', 'upper', 'states'):
+            A['ax'].draw_artist(A[name])
+    #endregion
+
     def updateDisplayWidgets(self, Model=None):
         # fill out the temperature values
 
@@ -2,6 +2,7 @@ from Otto_GUI import Ui_Form
 from PyQt5 import uic
 import sys
 from PyQt5 import QtWidgets as qtw
+from PyQt5 import QtCore as qtc
 from Otto import ottoCycleController
 from Air import *
 
@@ -10,7 +11,43 @@ from Air import *
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 
+class cycleWorkerSignals(qtc.QObject):
+    progress = qtc.pyqtSignal(int, int, int)  # generation, steps done, steps to do
+    finished = qtc.pyqtSignal(int, object)  # generation, the recalculated model
+    failed = qtc.pyqtSignal(int, str)  # generation, error message
+
+class cycleWorker(qtc.QRunnable):
+    """
+    Recalculates a copy of the model off the GUI thread.  Every request has a generation number and the worker gives
+    up as soon as its request is no longer the current one (isCurrent(generation) is False).
+    """
+    def __init__(self, generation, model, inputs, controller, isCurrent):
+        super().__init__()
+        self.generation=generation
+        self.model=model  # a copy (see ottoCycleModel.copy), the one on display is never touched
+        self.inputs=inputs
+        self.controller=controller
+        self.isCurrent=isCurrent
+        self.signals=cycleWorkerSignals()
+
+    def run(self):
+        gen=self.generation
+        try:
+            if not self.isCurrent(gen):
+                return
+            self.controller.setInputs(self.model, **self.inputs)
+            self.model.update(progress=lambda done, todo: self.signals.progress.emit(gen, done, todo),
+                              cancelled=lambda: not self.isCurrent(gen))
+            if self.isCurrent(gen):
+                self.signals.finished.emit(gen, self.model)
+        except Exception as e:
+            self.signals.failed.emit(gen, str(e))
+
 class MainWindow(qtw.QWidget, Ui_Form):
+    # live mode only recalculates inputs that are numbers, clamped to these (SI) limits
+    liveLimits = {'T_High': (1.0, 6000.0), 'T_0': (1.0, 6000.0), 'P_0': (1.0, 1.0e9), 'V_0': (1.0e-9, 1.0e3),
+                  'ratio': (1.0, 100.0)}
+
     def __init__(self):
         """MainWindow constructor"""
         super().__init__()
@@ -23,6 +60,26 @@ class MainWindow(qtw.QWidget, Ui_Form):
         self.canvas = FigureCanvasQTAgg(self.figure)
         self.ax = self.figure.add_subplot()
         self.main_VerticalLayout.addWidget(self.canvas)
+        self.progressBar=qtw.QProgressBar()
+        self.progressBar.setVisible(False)
+        self.main_VerticalLayout.addWidget(self.progressBar)
+
+        #calculations run on a worker thread, only the latest request (generation) is ever applied
+        self.threadPool=qtc.QThreadPool()
+        self.threadPool.setMaxThreadCount(1)
+        self.calcGeneration=0
+
+        #live mode:  edits restart a short timer and the cycle is recalculated once the typing pauses
+        self.chk_Live=qtw.QCheckBox('Live')
+        self.chk_Live.setToolTip('Recalculate as the inputs are edited')
+        self.gridLayout.addWidget(self.chk_Live, 4, 2, 1, 2)
+        self.liveTimer=qtc.QTimer(self)
+        self.liveTimer.setSingleShot(True)
+        self.liveTimer.setInterval(150)  # ms without an edit before recalculating
+        self.liveTimer.timeout.connect(self.liveCalc)
+        for le in (self.le_THigh, self.le_TLow, self.le_P0, self.le_V0, self.le_CR):
+            le.textEdited.connect(self.inputEdited)
+        self.chk_Live.toggled.connect(self.inputEdited)
 
         #setting up some signals and slots
         self.rdo_Metric.toggled.connect(self.setUnits) #triggered when the state of the radio button changes
@@ -47,6 +104,7 @@ class MainWindow(qtw.QWidget, Ui_Form):
         someWidgets+=[self.chk_LogAbcissa, self.chk_LogOrdinate, self.ax, self.canvas]
         #pass some widgets to the controller for both input and output
         self.controller.setWidgets(w=someWidgets)
+        self.controller.view.reuseArtists=True  # update the plot in place rather than rebuilding it
 
         #show the form
         self.show()
@@ -81,11 +139,79 @@ class MainWindow(qtw.QWidget, Ui_Form):
 
     def calcOtto(self):
         '''
-        This is called when the calculate button is clicked
+        This is called when the calculate button is clicked.  The cycle is recalculated on a copy of the model in a
+        worker thread and the copy replaces the model on display when it is done, unless a newer request came in.
         :return: nothing
         '''
         #calculate the cycle efficiency (and states 1,2,3,4)
-        self.controller.calc()
+        try:
+            inputs=self.controller.readInputs()
+        except ValueError as e:
+            qtw.QMessageBox.warning(self, 'Otto Cycle', str(e))
+            return
+        self.startCalc(inputs)
+
+    def startCalc(self, inputs):
+        '''
+        Starts recalculating the cycle for inputs (the arguments of ottoCycleController.set) in a worker thread.
+        :return: nothing
+        '''
+        self.liveTimer.stop()
+        self.calcGeneration+=1
+        self.threadPool.clear()  # drop requests that have not started, they are superseded
+        worker=cycleWorker(self.calcGeneration, self.controller.model.copy(), inputs, self.controller, self.isCurrent)
+        worker.signals.progress.connect(self.calcProgress)
+        worker.signals.finished.connect(self.calcFinished)
+        worker.signals.failed.connect(self.calcFailed)
+        self.threadPool.start(worker)
+
+    def inputEdited(self):
+        if self.chk_Live.isChecked():
+            self.liveTimer.start()  # (re)start, so a burst of keystrokes leads to one calculation
+
+    def liveCalc(self):
+        '''
+        Recalculates the cycle from the inputs as they are.  Nothing happens while an input is not a number (e.g.,
+        half typed), and values outside liveLimits are clamped to them.
+        :return: nothing
+        '''
+        if not self.chk_Live.isChecked():
+            return
+        SI=self.rdo_Metric.isChecked()
+        U=self.controller.model.units
+        CF={'T_High': U.CF_T, 'T_0': U.CF_T, 'P_0': U.CF_P, 'V_0': U.CF_V, 'ratio': 1.0}
+        inputs={'SI': SI}
+        for name, le in (('T_High', self.le_THigh), ('T_0', self.le_TLow), ('P_0', self.le_P0), ('V_0', self.le_V0),
+                         ('ratio', self.le_CR)):
+            if not self.isfloat(le.text()):
+                return
+            low, high=self.liveLimits[name]
+            cf=1.0 if SI else CF[name]
+            inputs[name]=self.clamp(le.text(), low*cf, high*cf)
+        self.startCalc(inputs)
+
+    def isCurrent(self, generation):
+        return generation==self.calcGeneration
+
+    def calcProgress(self, generation, done, todo):
+        if not self.isCurrent(generation):
+            return
+        self.progressBar.setMaximum(max(todo, 1))
+        self.progressBar.setValue(done)
+        self.progressBar.setVisible(done<todo)
+
+    def calcFinished(self, generation, model):
+        if not self.isCurrent(generation):
+            return
+        self.controller.model=model
+        self.controller.updateView()
+        self.progressBar.setVisible(False)
+
+    def calcFailed(self, generation, message):
+        if not self.isCurrent(generation):
+            return
+        self.progressBar.setVisible(False)
+        qtw.QMessageBox.warning(self, 'Otto Cycle', message)
 
 #if this module is being imported, this won't run. If it is the main module, it will run.
 if __name__== '__main__':
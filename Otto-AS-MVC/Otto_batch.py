@@ -0,0 +1,142 @@
+from Otto_sweep import *
+import sys
+import csv
+import json
+import argparse
+from itertools import islice
+
+# the inputs of a case (see solveOttoCycles) and their values when a case leaves them out
+caseInputs = {'ratio': 6.0, 't_high': 1500.0, 't_initial': 298.0, 'p_initial': 1000.0, 'v_cylinder': 1.0}
+
+def readCases(stream, fmt='csv'):
+    """
+    Reads operating points one at a time from CSV (with a header row) or JSON lines (one object per line).
+    Columns other than the case inputs are passed through to the results, e.g., a case id.
+    :param stream: text stream to read
+    :param fmt: 'csv' or 'jsonl'
+    :return: generator of (line number, dictionary) pairs (ValueError for a line that is not a JSON object)
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+    else:
+        for lineNum, line in enumerate(stream, start=1):
+            if line.strip():
+                try:
+                    case = json.loads(line)
+                except json.JSONDecodeError as e:
+                    raise ValueError('line {}: {} (column {})'.format(lineNum, e.msg, e.colno))
+                if not isinstance(case, dict):
+                    raise ValueError('line {}: expected a JSON object'.format(lineNum))
+                yield lineNum, case
+
+def solveCases(cases, chunkSize=4096, keepStates=False, Air=None):
+    """
+    Solves a stream of cases chunkSize at a time with solveOttoCycles, so memory stays constant however long the
+    stream is.  A pass-through column named like a result (e.g., Eff) is kept as 'input.Eff'.
+    :param cases: iterable of (line number, dictionary) pairs (see readCases)
+    :param chunkSize: cases solved per batch
+    :param keepStates: add the State1-State4 columns ('State1.T' etc.) to the results
+    :param Air: the air object to use (a new one if None)
+    :return: generator of result dictionaries (the case followed by sweepResultNames(keepStates))
+    """
+    a = Air if Air is not None else air()
+    names = sweepResultNames(keepStates)
+    cases = iter(cases)
+    while True:
+        chunk = list(islice(cases, chunkSize))
+        if not chunk:
+            return
+        inputs = {name: np.empty(len(chunk)) for name in caseInputs}
+        for i, (lineNum, case) in enumerate(chunk):
+            for name, default in caseInputs.items():
+                val = case.get(name)
+                try:
+                    inputs[name][i] = default if val is None or val == '' else float(val)
+                except (TypeError, ValueError):
+                    raise ValueError('line {}: {}={!r} is not a number'.format(lineNum, name, val))
+        r = solveOttoCycles(Air=a, **inputs)
+        for st in ('State1', 'State2', 'State3', 'State4'):
+            S = r.pop(st)
+            for col in StateArray.columns:
+                r[st+'.'+col] = getattr(S, col)
+        for i, (lineNum, case) in enumerate(chunk):
+            row = {('input.'+key if key in names else key): val for key, val in case.items()}
+            row.update({name: float(r[name][i]) for name in names})
+            yield row
+
+def writeResults(rows, stream, fmt='csv', flushEvery=1024):
+    """
+    Writes result rows as they come.  The CSV columns are those of the first row:  a later row missing one leaves it
+    empty, and a column that only turns up later (JSON lines cases need not share keys) is left out with a warning.
+    :param rows: iterable of dictionaries
+    :param stream: text stream to write
+    :param fmt: 'csv' or 'jsonl'
+    :param flushEvery: rows between flushes of the stream
+    :return: number of rows written
+    """
+    count = 0
+    writer = None
+    for row in rows:
+        if fmt == 'csv':
+            if writer is None:
+                fieldNames = set(row.keys())
+                writer = csv.DictWriter(stream, fieldnames=list(row.keys()), lineterminator='\n',
+                                        extrasaction='ignore')
+                writer.writeheader()
+            extra = [key for key in row if key not in fieldNames]
+            if extra:
+                fieldNames.update(extra)
+                print('Otto_batch: warning: row {}: column(s) {} not in the CSV header, left out'.format(
+                    count+1, ', '.join(extra)), file=sys.stderr)
+            writer.writerow(row)
+        else:
+            stream.write(json.dumps(row)+'\n')
+        count += 1
+        if count % flushEvery == 0:
+            stream.flush()
+    stream.flush()
+    return count
+
+def guessFormat(fileName, default='csv'):
+    if fileName.endswith('.jsonl') or fileName.endswith('.json'):
+        return 'jsonl'
+    if fileName.endswith('.csv'):
+        return 'csv'
+    return default
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Solves air standard Otto cycles for a stream of operating points '
+                                                 '(columns ratio, t_high, t_initial, p_initial, v_cylinder in SI '
+                                                 'units, anything else is passed through).')
+    parser.add_argument('input', nargs='?', default='-', help='CSV or JSON lines file (default: stdin)')
+    parser.add_argument('-o', '--output', default='-', help='output file (default: stdout)')
+    parser.add_argument('-f', '--format', choices=('csv', 'jsonl'), help='input format (default: from the file name, else csv)')
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'), help='output format (default: the input format)')
+    parser.add_argument('--chunk-size', type=int, default=4096, help='cases solved per batch')
+    parser.add_argument('--states', action='store_true', help='include the properties of states 1-4')
+    parser.add_argument('--tables', action='store_true', help='invert T with property tables (faster, ~1e-5 K)')
+    args = parser.parse_args(argv)
+
+    fmtIn = args.format or guessFormat(args.input)
+    fmtOut = args.output_format or (guessFormat(args.output, fmtIn) if args.output != '-' else fmtIn)
+    a = air()
+    if args.tables:
+        a.useTables()
+    fin = sys.stdin if args.input == '-' else open(args.input, newline='')
+    fout = sys.stdout if args.output == '-' else open(args.output, 'w', newline='')
+    try:
+        rows = solveCases(readCases(fin, fmtIn), chunkSize=args.chunk_size, keepStates=args.states, Air=a)
+        count = writeResults(rows, fout, fmtOut)
+    except ValueError as e:
+        sys.exit('Otto_batch: {}'.format(e))
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+    print('{} cases'.format(count), file=sys.stderr)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+from Air import *
+import time
+
+#region slider-crank kinematics and heat release
+def cylinderVolume(theta, ratio=8.0, v_cylinder=0.0005, rodRatio=3.5):
+    """
+    Cylinder volume of a slider-crank mechanism:
+    V=Vc+Vd/2*(R+1-cos(theta)-sqrt(R**2-sin(theta)**2))
+    with the clearance volume Vc=Vd/(r-1) and the displacement Vd=V_BDC*(r-1)/r.
+    :param theta: crank angle in degrees (0 at TDC, -180 and 180 at BDC)
+    :param ratio: compression ratio V_BDC/V_TDC
+    :param v_cylinder: volume at BDC in m^3
+    :param rodRatio: connecting rod length/crank radius
+    :return: volume in m^3
+    """
+    th = np.radians(theta)
+    Vd = v_cylinder*(ratio-1.0)/ratio
+    return Vd*(1.0/(ratio-1.0)+0.5*(rodRatio+1.0-np.cos(th)-np.sqrt(rodRatio**2-np.sin(th)**2)))
+
+def dlnVdTheta(theta, ratio=8.0, rodRatio=3.5):
+    """
+    d(ln V)/d(theta) of the slider-crank volume (see cylinderVolume), which does not depend on the size of the cylinder.
+    :return: 1/degree
+    """
+    th = np.radians(theta)
+    sin, cos = np.sin(th), np.cos(th)
+    dVdTheta = 0.5*(sin+sin*cos/np.sqrt(rodRatio**2-sin**2))  # per radian, in units of Vd
+    V = 1.0/(ratio-1.0)+0.5*(rodRatio+1.0-cos-np.sqrt(rodRatio**2-sin**2))
+    return np.radians(dVdTheta/V)
+
+def wiebe(theta, thetaStart=-15.0, duration=40.0, a=5.0, m=2.0):
+    """
+    Wiebe function for the fraction of the charge burned:
+    x=1-exp(-a*((theta-thetaStart)/duration)**(m+1)) after thetaStart (0 before)
+    :param theta: crank angle in degrees
+    :param thetaStart: crank angle in degrees where burning starts (spark timing)
+    :param duration: burn duration in degrees
+    :param a: efficiency factor (5 burns 99.3% of the charge in duration)
+    :param m: form factor
+    :return: (x, dx/dtheta in 1/degree)
+    """
+    y = np.maximum(theta-thetaStart, 0.0)/duration
+    e = np.exp(-a*y**(m+1.0))
+    return 1.0-e, a*(m+1.0)/duration*y**m*e
+#endregion
+
+def solveCrankOtto(ratio=8.0, thetaStart=-15.0, duration=40.0, q_in=50000.0, t_initial=300.0, p_initial=101325.0,
+                   v_cylinder=0.0005, rodRatio=3.5, a=5.0, m=2.0, dTheta=1.0, minBurnSteps=4, keepTraces=True,
+                   Air=None):
+    """
+    Crank angle resolved Otto cycle:  the closed part of the cycle from BDC (-180 degrees) through TDC (0) to BDC
+    (180) with slider-crank volume, heat released by a Wiebe function and the variable cv of air.  With no heat
+    transfer or blowby the first law for the charge is
+    cv(T)*dT/dtheta=q_in*dx/dtheta-Rbar*T*dln(V)/dtheta
+    which is integrated with RK4 on a fixed crank angle grid, for all the cases (the arrays of inputs broadcast
+    against each other) at once.  The integration variable is u(T) rather than T:
+    du/dtheta=q_in*dx/dtheta-Rbar*T*dln(V)/dtheta
+    so the heat release goes in without being divided by cv (a short burn is steep in T but just a quadrature in u)
+    and the kink of cv at 1630 K is only a kink of T(u).  T(u) is a few Newton steps from T at the start of the step.
+    The heat released so far, q_in*x, is integrated as a second RK4 state with the same stages, so the work from the
+    first law W=n*(q_released-(u(180)-u(-180))) only counts heat the integration actually put into the charge (it
+    equals the integral of P*dV over the same steps).  The stages only sample dx/dtheta, so a burn has to span a few
+    steps to be resolved:  cases with duration<minBurnSteps*dTheta are rejected.
+    :param ratio: compression ratio V_BDC/V_TDC
+    :param thetaStart: crank angle in degrees where burning starts (spark timing, negative before TDC)
+    :param duration: burn duration in degrees (see wiebe)
+    :param q_in: heat released by burning all the charge in J/mol of air
+    :param t_initial: T at BDC in K
+    :param p_initial: P at BDC in Pa
+    :param v_cylinder: volume at BDC in m^3
+    :param rodRatio: connecting rod length/crank radius
+    :param a: Wiebe efficiency factor
+    :param m: Wiebe form factor
+    :param dTheta: crank angle step in degrees (for a 40 degree burn efficiencies agree to ~2e-5 % between 1 and
+                   0.1 degree steps, for a burn of 5 steps to ~4e-4 %)
+    :param minBurnSteps: fewest steps a burn may span (see above)
+    :param keepTraces: False to skip T(theta) and P(theta) (a sweep of many cases usually only needs the totals)
+    :param Air: the air object to use (a new one if None)
+    :return: dictionary of arrays in the shape of the cases:  W (indicated work, J), IMEP (Pa), Eff (indicated
+             efficiency, %), n (moles of air), T_max (K), P_max (Pa) and theta_Pmax (degrees), and with keepTraces,
+             theta (degrees) and T (K), P (Pa) and V (m^3) with the crank angle on the last axis
+    """
+    A = Air if Air is not None else air()
+    inputs = np.broadcast_arrays(*[np.asarray(x, dtype=float) for x in
+                                   (ratio, thetaStart, duration, q_in, t_initial, p_initial, v_cylinder, rodRatio, a, m)])
+    shape = inputs[0].shape
+    ratio, thetaStart, duration, q_in, t_initial, p_initial, v_cylinder, rodRatio, a, m = [x.ravel() for x in inputs]
+
+    nSteps = int(np.ceil(360.0/dTheta))
+    h = 360.0/nSteps
+    if duration.size and duration.min() < minBurnSteps*h:
+        raise ValueError('burn duration {:g} degrees is under {} crank angle steps of {:g} degrees; use a smaller '
+                         'dTheta'.format(duration.min(), minBurnSteps, h))
+    theta = np.linspace(-180.0, 180.0, nSteps+1)
+
+    def rates(th, T):
+        # (du/dtheta, dq_released/dtheta)
+        dq = q_in*wiebe(th, thetaStart, duration, a, m)[1]
+        return dq-A.RBar*T*dlnVdTheta(th, ratio, rodRatio), dq
+
+    def T_from_u(u, T):
+        for i in range(3):
+            T = T-(A.intCv(T)-u)/A.cv(T)
+        return T
+
+    def pressure(th, T):
+        return p_initial*(T/t_initial)*(v_cylinder/cylinderVolume(th, ratio, v_cylinder, rodRatio))
+
+    T = t_initial.copy()
+    u = A.intCv(T)
+    q = np.zeros_like(T)  # heat released so far, J/mol
+    T_max, P_max, theta_Pmax = T.copy(), p_initial.copy(), np.full(T.shape, theta[0])
+    if keepTraces:
+        TTrace = np.empty((nSteps+1, T.size))
+        TTrace[0] = T
+    for i in range(nSteps):
+        th = theta[i]
+        k1, q1 = rates(th, T)
+        k2, q2 = rates(th+0.5*h, T_from_u(u+0.5*h*k1, T))
+        k3, q3 = rates(th+0.5*h, T_from_u(u+0.5*h*k2, T))
+        k4, q4 = rates(th+h, T_from_u(u+h*k3, T))
+        u = u+h/6.0*(k1+2.0*k2+2.0*k3+k4)
+        q = q+h/6.0*(q1+2.0*q2+2.0*q3+q4)
+        T = T_from_u(u, T)
+        P = pressure(theta[i+1], T)
+        higher = P > P_max
+        P_max = np.where(higher, P, P_max)
+        theta_Pmax = np.where(higher, theta[i+1], theta_Pmax)
+        T_max = np.maximum(T_max, T)
+        if keepTraces:
+            TTrace[i+1] = T
+
+    # the work follows from the first law for the whole cycle with the heat the steps released:
+    # W=n*(q-(u(T(180))-u(T(-180)))), and the efficiency is based on the whole charge, q_in
+    n = p_initial*v_cylinder/(A.RBar*t_initial)
+    W = n*(q-A.deltau(t_initial, T))
+    Vd = v_cylinder*(ratio-1.0)/ratio
+    results = {'W': W, 'IMEP': W/Vd, 'Eff': 100.0*W/(n*q_in), 'n': n, 'T_max': T_max, 'P_max': P_max,
+               'theta_Pmax': theta_Pmax}
+    results = {name: val.reshape(shape) for name, val in results.items()}
+    if keepTraces:
+        V = cylinderVolume(theta[:, None], ratio, v_cylinder, rodRatio)
+        results['theta'] = theta
+        results['T'] = TTrace.T.reshape(shape+(nSteps+1,))
+        results['P'] = (p_initial*(TTrace/t_initial)*(v_cylinder/V)).T.reshape(shape+(nSteps+1,))
+        results['V'] = V.T.reshape(shape+(nSteps+1,))
+    return results
+
+def main():
+    # sweep spark timing and burn duration
+    thetaStart = np.linspace(-40.0, 0.0, 50)
+    duration = np.linspace(20.0, 80.0, 40)
+    t = time.time()
+    r = solveCrankOtto(ratio=10.0, thetaStart=thetaStart[:, None], duration=duration[None, :], keepTraces=False)
+    print('{} cases in {:0.2f} s'.format(r['Eff'].size, time.time()-t))
+    i, j = np.unravel_index(np.argmax(r['IMEP']), r['IMEP'].shape)
+    print('Best:  spark at {:0.1f} deg, {:0.1f} deg burn -> IMEP {:0.1f} kPa, efficiency {:0.2f}%'.format(
+        thetaStart[i], duration[j], r['IMEP'][i, j]/1000.0, r['Eff'][i, j]))
+
+if __name__ == "__main__":
+    main()
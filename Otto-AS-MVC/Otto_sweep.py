@@ -0,0 +1,216 @@
+from Air import *
+import os
+import time
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+chunkSizeSerial = 65536  # cases solved per batch when a sweep is not told otherwise (bounds the temporary memory)
+
+def solveOttoCycles(ratio=6.0, t_high=1500.0, t_initial=298.0, p_initial=1000.0, v_cylinder=1.0, Air=None):
+    """
+    Solves air standard Otto cycles for arrays of inputs at once (the arrays broadcast against each other).
+    The states and energy terms are the same as ottoCycleController.set calculates for one cycle:
+    1-2 isentropic compression, 2-3 constant volume heat addition, 3-4 isentropic expansion, 4-1 constant volume
+    heat rejection.  All inputs are in SI units and nothing here needs Qt.
+    :param ratio: compression ratio V_BDC/V_TDC
+    :param t_high: T3 in K
+    :param t_initial: T1 in K
+    :param p_initial: P1 in Pa
+    :param v_cylinder: cylinder volume in m^3
+    :param Air: the air object to use (a new one if None)
+    :return: dictionary of arrays:  State1-State4 (StateArray, molar), W_Compression, W_Power, Q_In, Q_Out,
+             W_Cycle (J/mol), Eff (%) and n (moles of air in the cylinder)
+    """
+    a = Air if Air is not None else air()
+    ratio = np.asarray(ratio, dtype=float)
+    State1 = a.set_many(P=p_initial, T=t_initial)
+    State2 = a.set_many(v=State1.v/ratio, s=State1.s)
+    State3 = a.set_many(T=t_high, v=State2.v)
+    State4 = a.set_many(v=State1.v, s=State3.s)
+    W_Compression = State2.u-State1.u
+    W_Power = State3.u-State4.u
+    Q_In = State3.u-State2.u
+    Q_Out = State4.u-State1.u
+    W_Cycle = W_Power-W_Compression
+    return {'State1': State1, 'State2': State2, 'State3': State3, 'State4': State4,
+            'W_Compression': W_Compression, 'W_Power': W_Power, 'Q_In': Q_In, 'Q_Out': Q_Out,
+            'W_Cycle': W_Cycle, 'Eff': 100.0*W_Cycle/Q_In, 'n': v_cylinder/State1.v}
+
+def orientInputs(ratio=6.0, t_high=1500.0, t_initial=298.0, p_initial=1000.0, v_cylinder=1.0, grid=False):
+    """
+    Shapes the sweep inputs so they broadcast to the shape of the sweep (without broadcasting them yet).
+    :param grid: if True each input is an axis and the sweep covers their outer product (shape is the axis lengths)
+                 if False the inputs broadcast against each other
+    :return: list of 5 arrays in the order ratio, t_high, t_initial, p_initial, v_cylinder
+    """
+    inputs = [np.asarray(x, dtype=float) for x in (ratio, t_high, t_initial, p_initial, v_cylinder)]
+    if grid:
+        inputs = [np.ravel(x) for x in inputs]
+        inputs = [x.reshape([-1 if i == j else 1 for j in range(len(inputs))]) for i, x in enumerate(inputs)]
+    return inputs
+
+def sweepInputs(ratio=6.0, t_high=1500.0, t_initial=298.0, p_initial=1000.0, v_cylinder=1.0, grid=False):
+    """
+    Lines up the sweep inputs as broadcast views (no copies, even for huge grids).  See orientInputs.
+    :return: (list of 5 broadcast arrays in the order ratio, t_high, t_initial, p_initial, v_cylinder, shape)
+    """
+    inputs = np.broadcast_arrays(*orientInputs(ratio, t_high, t_initial, p_initial, v_cylinder, grid=grid))
+    return inputs, inputs[0].shape
+
+def sweepOttoCycle(ratio=6.0, t_high=1500.0, t_initial=298.0, p_initial=1000.0, v_cylinder=1.0, grid=False,
+                   chunkSize=None, keepStates=True, Air=None, workers=1):
+    """
+    Headless parameter sweep of the air standard Otto cycle (see solveOttoCycles).
+    The cases are solved chunkSize at a time and written into preallocated result arrays, so the temporary memory
+    stays bounded however many cases there are (a 10**6 point grid never builds its full input arrays).
+    :param grid: True to sweep the outer product of the inputs, False to broadcast them against each other
+    :param chunkSize: cases solved per batch (None for chunkSizeSerial, or with workers see sweepOttoCycleParallel)
+    :param keepStates: False to leave State1-State4 out of the result (they are 3/4 of its memory)
+    :param Air: the air object to use (a new one if None, ignored by worker processes)
+    :param workers: number of worker processes (None for one per CPU).  More than 1 uses sweepOttoCycleParallel.
+    :return: dictionary like solveOttoCycles, with every array in the shape of the sweep
+    """
+    if workers is None or workers>1:
+        return sweepOttoCycleParallel(ratio, t_high, t_initial, p_initial, v_cylinder, grid=grid,
+                                      chunkSize=chunkSize, keepStates=keepStates, workers=workers)
+    a = Air if Air is not None else air()
+    inputs, shape = sweepInputs(ratio, t_high, t_initial, p_initial, v_cylinder, grid=grid)
+    results = newSweepResults(shape, keepStates=keepStates)
+    N = int(np.prod(shape))
+    chunkSize = chunkSizeSerial if chunkSize is None else chunkSize
+    for start in range(0, N, chunkSize):
+        solveSweepChunk(inputs, results, start, min(start+chunkSize, N), a)
+    return results
+
+def sweepResultNames(keepStates=True):
+    """
+    :return: the names of the result arrays of a sweep, with the state columns as 'State1.T' etc.
+    """
+    names = ['W_Compression', 'W_Power', 'Q_In', 'Q_Out', 'W_Cycle', 'Eff', 'n']
+    if keepStates:
+        names += [st+'.'+col for st in ('State1', 'State2', 'State3', 'State4') for col in StateArray.columns]
+    return names
+
+def newSweepResults(shape, keepStates=True, buffer=None):
+    """
+    Allocates the result arrays of a sweep.
+    :param shape: shape of the sweep
+    :param keepStates: include State1-State4
+    :param buffer: optional flat float64 array to lay the results out in (len(sweepResultNames)*size values)
+    :return: dictionary like solveOttoCycles
+    """
+    names = sweepResultNames(keepStates)
+    size = int(np.prod(shape))
+    if buffer is None:
+        buffer = np.empty(len(names)*size)
+    results = {name: buffer[i*size:(i+1)*size].reshape(shape) for i, name in enumerate(names)}
+    if keepStates:
+        for st in ('State1', 'State2', 'State3', 'State4'):
+            results[st] = StateArray(*[results.pop(st+'.'+col) for col in StateArray.columns], name=st)
+    return results
+
+def solveSweepChunk(inputs, results, start, stop, Air):
+    """
+    Solves the flat case indices [start, stop) of a sweep and writes them into the results.
+    """
+    shape = inputs[0].shape or (1,)  # a sweep of one case (all inputs scalars) is indexed as 1 long
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    r = solveOttoCycles(*[x.reshape(shape)[idx] for x in inputs], Air=Air)
+    for name, data in results.items():
+        if isinstance(data, StateArray):
+            for col in StateArray.columns:
+                getattr(data, col).reshape(-1)[start:stop] = getattr(r[name], col)
+        else:
+            data.reshape(-1)[start:stop] = r[name]
+
+#region process pool backend
+def sweepOttoCycleParallel(ratio=6.0, t_high=1500.0, t_initial=298.0, p_initial=1000.0, v_cylinder=1.0, grid=False,
+                           chunkSize=None, keepStates=True, workers=None):
+    """
+    sweepOttoCycle on a pool of worker processes.  The inputs and the result arrays live in shared memory:  each
+    worker maps them once, solves the chunks of flat case indices it is handed and writes its answers straight into
+    the shared results, so nothing but a (start, stop) pair is pickled per chunk and the results come back in order
+    however the chunks finish.
+    :param chunkSize: cases per task (None for about 4 tasks per worker, so the uneven tail is short, but at most
+                      chunkSizeSerial to bound each worker's temporary memory)
+    :param workers: number of worker processes (None for one per CPU)
+    :return: dictionary like solveOttoCycles, with every array in the shape of the sweep
+    """
+    workers = os.cpu_count() if workers is None else workers
+    inputs = orientInputs(ratio, t_high, t_initial, p_initial, v_cylinder, grid=grid)
+    shape = np.broadcast_shapes(*[x.shape for x in inputs])
+    N = int(np.prod(shape))
+    if chunkSize is None:
+        chunkSize = min(chunkSizeSerial, max(1, -(-N//(4*workers))))
+    nResults = len(sweepResultNames(keepStates))*N
+    shmIn = shared_memory.SharedMemory(create=True, size=8*max(sum(x.size for x in inputs), 1))
+    shmOut = shared_memory.SharedMemory(create=True, size=8*max(nResults, 1))
+    try:
+        sharedInputs = sharedArrays(shmIn, [x.shape for x in inputs])
+        for shared, x in zip(sharedInputs, inputs):
+            shared[...] = x
+        del sharedInputs, shared
+        spec = (shmIn.name, [x.shape for x in inputs], shmOut.name, shape, keepStates)
+        ranges = [(start, min(start+chunkSize, N)) for start in range(0, N, chunkSize)]
+        with mp.Pool(workers, initializer=attachSweepWorker, initargs=(spec,)) as pool:
+            for done in pool.imap_unordered(solveSweepRange, ranges):
+                pass
+        sharedOut = np.ndarray((nResults,), dtype=float, buffer=shmOut.buf)
+        buffer = sharedOut.copy()
+        del sharedOut
+    finally:
+        shmIn.close()
+        shmIn.unlink()
+        shmOut.close()
+        shmOut.unlink()
+    return newSweepResults(shape, keepStates=keepStates, buffer=buffer)
+
+def sharedArrays(shm, shapes):
+    """
+    Lays float64 arrays of the given shapes end to end in a shared memory block.
+    :return: list of numpy arrays backed by shm
+    """
+    arrays = []
+    offset = 0
+    for shape in shapes:
+        size = int(np.prod(shape))
+        arrays.append(np.ndarray(shape, dtype=float, buffer=shm.buf, offset=8*offset))
+        offset += size
+    return arrays
+
+sweepWorker = {}  # what each worker process of sweepOttoCycleParallel keeps between chunks
+
+def attachSweepWorker(spec):
+    """
+    Pool initializer:  maps the shared inputs and results of sweepOttoCycleParallel into this worker.
+    """
+    inName, inShapes, outName, shape, keepStates = spec
+    shmIn = shared_memory.SharedMemory(name=inName)
+    shmOut = shared_memory.SharedMemory(name=outName)
+    nResults = len(sweepResultNames(keepStates))*int(np.prod(shape))
+    sweepWorker['shm'] = (shmIn, shmOut)  # the parent owns (and unlinks) the blocks
+    sweepWorker['inputs'] = np.broadcast_arrays(*sharedArrays(shmIn, inShapes))
+    sweepWorker['results'] = newSweepResults(shape, keepStates=keepStates,
+                                             buffer=np.ndarray((nResults,), dtype=float, buffer=shmOut.buf))
+    sweepWorker['air'] = air()
+
+def solveSweepRange(startStop):
+    """
+    Pool task:  solves the flat case indices [start, stop) into the shared results.
+    """
+    start, stop = startStop
+    solveSweepChunk(sweepWorker['inputs'], sweepWorker['results'], start, stop, sweepWorker['air'])
+    return stop-start
+#endregion
+
+def main():
+    CR = np.linspace(4.0, 16.0, 1000)
+    TH = np.linspace(1200.0, 2800.0, 1000)
+    t = time.time()
+    r = sweepOttoCycle(ratio=CR, t_high=TH, t_initial=300.0, p_initial=101325.0, v_cylinder=0.001, grid=True,
+                       keepStates=False)
+    print('{} cycles in {:0.2f} s'.format(r['Eff'].size, time.time()-t))
+    print('Efficiency from {:0.2f}% to {:0.2f}%'.format(r['Eff'].min(), r['Eff'].max()))
+
+if __name__ == "__main__":
+    main()
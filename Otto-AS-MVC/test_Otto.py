@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+
+from Otto import ottoCycleModel
+
+def distanceToPolyline(x, y, X, Y):
+    """
+    Distance of each point (X, Y) from the polyline through (x, y).
+    """
+    d = np.full(len(X), np.inf)
+    for i in range(len(x)-1):
+        ex, ey = x[i+1]-x[i], y[i+1]-y[i]
+        f = np.clip(((X-x[i])*ex+(Y-y[i])*ey)/max(ex*ex+ey*ey, 1e-300), 0.0, 1.0)
+        d = np.minimum(d, np.hypot(X-x[i]-f*ex, Y-y[i]-f*ey))
+    return d
+
+@pytest.mark.parametrize('ratio, t_high', [(4.0, 800.0), (6.0, 1500.0), (10.0, 2000.0), (20.0, 3000.0)])
+@pytest.mark.parametrize('log', [False, True])
+def test_adaptive_curves_within_tolerance_on_P_v_axes(ratio, t_high, log):
+    """
+    The adaptively sampled process curves are within curveTolerance of the exact curves (as a fraction of the
+    plot range) on linear and on log P-v axes.
+    """
+    m = ottoCycleModel()
+    m.setInputs(Ratio=ratio, T_high=t_high, T_initial=300.0, p_initial=101325.0)
+    m.update()
+    scale = np.log if log else (lambda x: x)
+    states = (m.State1, m.State2, m.State3, m.State4)
+    PEnds, vEnds = scale(np.array([S.P for S in states])), scale(np.array([S.v for S in states]))
+    plot = lambda S: ((scale(S.v)-vEnds.min())/np.ptp(vEnds), (scale(S.P)-PEnds.min())/np.ptp(PEnds))
+    x, y = [np.concatenate(xy) for xy in zip(plot(m.upperCurve), plot(m.lowerCurve))]
+    t = np.linspace(0.0, 1.0, 20001)
+    for leg in range(len(m.legs)):
+        X, Y = plot(m.legStates(np.full(t.shape, leg), t))
+        assert distanceToPolyline(x, y, X, Y).max() <= m.curveTolerance
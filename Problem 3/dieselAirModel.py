@@ -0,0 +1,145 @@
+# dieselAirModel.py
+
+import os
+import sys
+from functools import lru_cache
+
+import numpy as np
+
+from dieselModel import DieselCycleModel, RESULT_DTYPE
+
+# The air property model lives with the Otto cycle simulator
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'Otto-AS-MVC'))
+from Air import air
+
+
+# distance of rc from 1 inside which the efficiency is interpolated from the Otto limit (see solve_batch)
+_RC_BLEND = 1e-3
+
+
+@lru_cache(maxsize=1)
+def _isentrope_table(n=1 << 16, TLow=100.0, THigh=6000.0):
+    """
+    Build (once) a lookup of T against sv0(T) = intCvOverT(T) on a uniform sv0 grid.
+
+    Along an isentrope sv0(T2) = sv0(T1) - Rbar*ln(v2/v1), so every isentrope of every case
+    is a lookup in this one table. With a uniform grid the lookup is index arithmetic
+    (no search), and linear interpolation is good to ~1e-5 K before the Newton polish in
+    _isentrope_T.
+
+    Returns:
+        tuple: (air object, sv0 at the first node, 1/spacing, T at the nodes)
+    """
+    a = air()
+    T_dense = np.unique(np.append(np.geomspace(TLow, THigh, 8 * n), a.TLowRange))
+    sv0_dense = a.intCvOverT(T_dense)
+    # --- Put a node on the cv jump at TLowRange, so no interval interpolates across it ---
+    spacing = (sv0_dense[-1] - sv0_dense[0]) / (n - 1)
+    sv0_switch = a.intCvOverT(a.TLowRange)
+    first = sv0_switch - np.ceil((sv0_switch - sv0_dense[0]) / spacing) * spacing
+    sv0 = first + spacing * np.arange(n + 1)
+    T = np.interp(sv0, sv0_dense, T_dense)
+    return a, first, 1 / spacing, T
+
+
+def _isentrope_T(T_start, volume_ratio):
+    """
+    Temperature after an isentropic process of an ideal gas with variable cv.
+
+    Args:
+        T_start (numpy.ndarray): Temperature at the start (K).
+        volume_ratio (numpy.ndarray): v_end/v_start.
+
+    Ends outside the table (100-6000 K) are solved with air.T_from_solver down to the bottom
+    of the cp fit (air.TMin), and are NaN above its top (air.TMax), like propertyTable.T_from.
+
+    Returns:
+        numpy.ndarray: Temperature at the end (K).
+    """
+    a, sv0_first, inv_spacing, T_nodes = _isentrope_table()
+    target = np.asarray(a.intCvOverT(T_start) - a.RBar * np.log(volume_ratio), dtype=float)
+    # --- Table lookup: linear interpolation between the two neighbouring nodes ---
+    x = np.clip((target - sv0_first) * inv_spacing, 0, len(T_nodes) - 1.000001)
+    i = x.astype(np.intp)
+    dT = T_nodes[i + 1] - T_nodes[i]
+    T = T_nodes[i] + (x - i) * dT
+    # --- One Newton step on the exact sv0(T), with dT/dsv0 from the table interval ---
+    T = np.asarray(T - (a.intCvOverT(T) - target) * (dT * inv_spacing))
+
+    # --- Targets past the ends of the table ---
+    outside = (target < a.intCvOverT(T_nodes[0])) | (target > a.intCvOverT(T_nodes[-1]))
+    if outside.any():
+        T = np.where(outside, np.nan, T)
+        in_fit = outside & (target >= a.intCvOverT(a.TMin)) & (target <= a.intCvOverT(a.TMax))
+        if in_fit.any():
+            T[in_fit] = a.T_from_solver('sv0', target[in_fit] - a.intCvOverT(a.StandardState.T))
+    return T
+
+
+class DieselAirCycleModel(DieselCycleModel):
+    """
+    Ideal Diesel cycle with the temperature dependent specific heats of air (Air.py) instead of constant k.
+
+    Same attributes and results as DieselCycleModel (k is not used). The states follow from:
+        1 -> 2: isentropic, v2 = v1/r
+        2 -> 3: constant pressure, v3 = rc*v2, so T3 = rc*T2
+        3 -> 4: isentropic, v4 = v1
+        efficiency = 1 - (u4 - u1)/(h3 - h2)
+    The P-v curves (pv_curves) are still the constant k ones.
+    """
+
+    def solve_batch(self, r=None, rc=None, T1=None, P1=None, k=None):
+        """
+        Solve the variable specific heat Diesel cycle for arrays of inputs at once.
+
+        Args:
+            r (array_like): Compression ratio (V1/V2).
+            rc (array_like): Cutoff ratio (V3/V2).
+            T1 (array_like): Initial temperature at state 1 (K).
+            P1 (array_like): Initial pressure at state 1 (MPa).
+            k (array_like): Ignored (the specific heats come from the air model).
+
+        Returns:
+            numpy.ndarray: Structured array in the broadcast shape of the inputs with the
+            fields of RESULT_DTYPE ('T2', 'P2', 'T3', 'P3', 'T4', 'P4', 'efficiency').
+        """
+        r, rc, T1, P1 = [np.asarray(self_val if val is None else val, dtype=float)
+                         for val, self_val in zip((r, rc, T1, P1), (self.r, self.rc, self.T1, self.P1))]
+        a = _isentrope_table()[0]
+        shape = np.broadcast_shapes(r.shape, rc.shape, T1.shape, P1.shape)
+        results = np.empty(shape, dtype=RESULT_DTYPE)
+
+        # --- Step 1: Isentropic compression from state 1 -> state 2 (on the inputs of T1 and r only) ---
+        T2 = _isentrope_T(*np.broadcast_arrays(T1, 1 / r))
+        results['T2'] = T2
+        results['P2'] = P1 * r * T2 / T1  # P*v/T is constant
+
+        # --- Step 2: Constant pressure heat addition from state 2 -> state 3 ---
+        T3 = T2 * rc
+        results['T3'] = T3
+        results['P3'] = results['P2']
+
+        # --- Step 3: Isentropic expansion from state 3 -> state 4 ---
+        T4 = _isentrope_T(*np.broadcast_arrays(T3, r / rc))
+        results['T4'] = T4
+        results['P4'] = P1 * T4 / T1  # v4 = v1
+
+        # --- Efficiency from the heat added at constant pressure and rejected at constant volume ---
+        q_in = a.intCp(T3) - a.intCp(T2)
+        q_out = a.intCv(T4) - a.intCv(T1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            efficiency = np.array(1 - q_out / q_in)
+        # Both heats go to 0 as rc -> 1 (the Otto limit), where the ratio tends to T1/T2. Within _RC_BLEND of
+        # rc = 1 the cancellation makes it noisy, so there it is interpolated linearly between the limit and
+        # its value at rc = 1 + _RC_BLEND (the curvature over that span is ~1e-9).
+        rc_b, r_b, T1_b, T2_b = np.broadcast_arrays(rc, r, T1, T2)
+        near = np.abs(rc_b - 1) < _RC_BLEND
+        if near.any():
+            T1_n, T2_n = T1_b[near], T2_b[near]
+            T3_0 = T2_n * (1 + _RC_BLEND)
+            T4_0 = _isentrope_T(T3_0, r_b[near] / (1 + _RC_BLEND))
+            limit = 1 - T1_n / T2_n
+            at_blend = 1 - (a.intCv(T4_0) - a.intCv(T1_n)) / (a.intCp(T3_0) - a.intCp(T2_n))
+            efficiency[near] = limit + (rc_b[near] - 1) / _RC_BLEND * (at_blend - limit)
+        results['efficiency'] = efficiency
+        return results
@@ -1,9 +1,49 @@
 # dieselController.py
 
-from dieselModel import DieselCycleModel
+from PyQt5 import QtCore
+from dieselModel import DieselCycleModel, DieselMapTiles
 from dieselView import DieselCycleView
 import numpy as np
 
+# Map quantities: (field of DieselMapTiles, scale factor, colorbar label)
+MAP_FIELDS = {
+    'Efficiency': ('efficiency', 100, 'Efficiency (%)'),
+    'T3': ('T3', 1, 'T3 (K)'),
+    'P3': ('P3', 1, 'P3 (MPa)'),
+}
+
+class MapWorkerSignals(QtCore.QObject):
+    """
+    Signals of a MapWorker (a QRunnable cannot emit signals itself).
+    """
+    progress = QtCore.pyqtSignal(int, int, int)  # generation, tiles done, tiles needed
+    finished = QtCore.pyqtSignal(int, object)    # generation, result of DieselMapTiles.render (None if cancelled)
+
+class MapWorker(QtCore.QRunnable):
+    """
+    Renders a window of the r x rc map off the GUI thread.
+
+    Args:
+        tiles (DieselMapTiles): Tile cache to render from.
+        generation (int): Request number, handed back with the signals.
+        is_current (callable): Returns False once a newer request has been made (the render then stops).
+        kwargs: Arguments of DieselMapTiles.render.
+    """
+
+    def __init__(self, tiles, generation, is_current, **kwargs):
+        super().__init__()
+        self.tiles = tiles
+        self.generation = generation
+        self.is_current = is_current
+        self.kwargs = kwargs
+        self.signals = MapWorkerSignals()
+
+    def run(self):
+        result = self.tiles.render(cancelled=lambda: not self.is_current(self.generation),
+                                   progress=lambda done, total: self.signals.progress.emit(self.generation, done, total),
+                                   **self.kwargs)
+        self.signals.finished.emit(self.generation, result)
+
 class DieselCycleController:
     """
     Controller class for the Diesel Cycle Simulator.
@@ -23,6 +63,29 @@ class DieselCycleController:
         # Connect the 'Calculate' button click to the calculate() function
         self.view.calcButton.clicked.connect(self.calculate)
 
+        # --- Map of the r x rc plane, evaluated in cached tiles on a worker thread ---
+        self.map_tiles = DieselMapTiles(self.model)
+        self.map_pool = QtCore.QThreadPool()
+        self.map_pool.setMaxThreadCount(1)
+        self.map_generation = 0        # Bumped by every map request; older renders are dropped
+        self.map_data = None           # Last rendered (r, rc, fields)
+        self.map_artists = {}          # Image, colorbar, contours and marker of the map
+        self.map_drawing = False       # True while the map sets its own limits
+        self.map_timer = QtCore.QTimer()  # Waits for panning/zooming to settle before rendering
+        self.map_timer.setSingleShot(True)
+        self.map_timer.setInterval(150)
+        self.map_timer.timeout.connect(self.request_map)
+
+        ax = self.view.mapAx
+        ax.set_xlim(4, 24)
+        ax.set_ylim(1, 4)
+        ax.set_autoscale_on(False)
+        ax.set_xlabel('Compression Ratio (r)')
+        ax.set_ylabel('Cutoff Ratio (rc)')
+        ax.callbacks.connect('xlim_changed', self.map_limits_changed)
+        ax.callbacks.connect('ylim_changed', self.map_limits_changed)
+        self.view.mapField.currentIndexChanged.connect(self.draw_map)
+
     def calculate(self):
         """
         Reads input values from the GUI, runs the Diesel cycle model calculations,
@@ -54,9 +117,12 @@ class DieselCycleController:
         # Plot the Diesel cycle on a P-v diagram
         self.plot_cycle(results)
 
+        # Map around the new operating point (only tiles for new T1, P1 are evaluated)
+        self.request_map()
+
     def plot_cycle(self, results):
         """
-        Plot the Diesel cycle as a simplified P-v diagram based on calculated results.
+        Plot the Diesel cycle on a P-v diagram along its process curves, with the state points marked.
 
         Args:
             results (dict): Dictionary of computed state points (T2, P2, T3, P3, T4, P4, efficiency).
@@ -64,24 +130,23 @@ class DieselCycleController:
         self.view.figure.clf()  # Clear any previous plot
         ax = self.view.figure.add_subplot(111)
 
+        # Process curves from the model, already reduced to the canvas width (cached by the model)
+        canvas = self.view.canvas
+        V, P = self.model.pv_plot_data(width=canvas.width() * canvas.devicePixelRatioF())
+
         # Assume V1 = 1 (arbitrary unit volume)
         V1 = 1
         V2 = V1 / self.model.r        # Compressed volume after compression
         V3 = self.model.rc * V2        # Expanded volume after heat addition
         V4 = V1                        # Final volume after expansion back to initial
 
-        # Pressures at each state point
-        P1 = self.model.P1
-        P2 = results['P2']
-        P3 = results['P3']
-        P4 = results['P4']
-
-        # Define lists of volumes and pressures for the plot
-        V = [V1, V2, V3, V4, V1]  # Cycle returns to starting point
-        P = [P1, P2, P3, P4, P1]
+        # State points 1-4
+        V_states = [V1, V2, V3, V4]
+        P_states = [self.model.P1, results['P2'], results['P3'], results['P4']]
 
         # Create the P-v diagram
-        ax.plot(V, P, marker='o')
+        ax.plot(V, P)
+        ax.plot(V_states, P_states, 'o', color='C0')
         ax.set_xlabel('Volume (arbitrary units)')
         ax.set_ylabel('Pressure (MPa)')
         ax.set_title('Diesel Cycle P-v Diagram')
@@ -89,3 +154,87 @@ class DieselCycleController:
 
         # Draw the updated canvas
         self.view.canvas.draw()
+
+    def map_limits_changed(self, ax):
+        """
+        Restart the map timer when the map is panned or zoomed (ignores the limits the map sets itself).
+        """
+        if not self.map_drawing:
+            self.map_timer.start()
+
+    def request_map(self):
+        """
+        Render the visible window of the map in the background, at about one cell per pixel.
+        Only the tiles that are not cached yet are evaluated; a newer request cancels this one.
+        """
+        self.map_timer.stop()
+        self.map_generation += 1
+        ax = self.view.mapAx
+        bbox = ax.get_window_extent()
+        worker = MapWorker(self.map_tiles, self.map_generation, self.map_is_current,
+                           r_range=ax.get_xlim(), rc_range=ax.get_ylim(),
+                           nx=min(max(int(bbox.width), 16), 1024), ny=min(max(int(bbox.height), 16), 1024),
+                           T1=self.model.T1, P1=self.model.P1, k=self.model.k)
+        worker.signals.progress.connect(self.map_progress)
+        worker.signals.finished.connect(self.map_finished)
+        self.map_pool.start(worker)
+
+    def map_is_current(self, generation):
+        return generation == self.map_generation
+
+    def map_progress(self, generation, done, total):
+        if self.map_is_current(generation):
+            self.view.mapStatus.setText(f'Tiles {done}/{total}')
+
+    def map_finished(self, generation, result):
+        if not self.map_is_current(generation) or result is None:
+            return
+        self.view.mapStatus.setText('')
+        self.map_data = result
+        self.draw_map()
+
+    def draw_map(self):
+        """
+        Draw the last rendered map for the selected quantity: a heatmap with contour lines
+        (taken on at most ~200 x 200 cells, so they stay fast on million-cell maps) and the operating point.
+        """
+        if self.map_data is None:
+            return
+        r, rc, fields = self.map_data
+        field, scale, label = MAP_FIELDS[self.view.mapField.currentText()]
+        values = fields[field] * scale
+        extent = (r[0] - (r[1] - r[0]) / 2, r[-1] + (r[1] - r[0]) / 2,
+                  rc[0] - (rc[1] - rc[0]) / 2, rc[-1] + (rc[1] - rc[0]) / 2)
+        ax = self.view.mapAx
+        artists = self.map_artists
+        limits = ax.get_xlim(), ax.get_ylim()
+        self.map_drawing = True
+        try:
+            if 'image' not in artists:
+                artists['image'] = ax.imshow(values, origin='lower', extent=extent, aspect='auto',
+                                             interpolation='nearest')
+                artists['colorbar'] = self.view.mapFigure.colorbar(artists['image'], ax=ax)
+                artists['point'], = ax.plot([], [], 'o', color='w', markeredgecolor='k')
+            else:
+                artists['image'].set_data(values)
+                artists['image'].set_extent(extent)
+            if not np.isnan(values).all():
+                artists['image'].set_clim(np.nanmin(values), np.nanmax(values))
+            artists['colorbar'].set_label(label)
+            artists['colorbar'].update_normal(artists['image'])
+
+            if artists.get('contours') is not None:
+                artists['contours'].remove()
+            artists['contours'] = None
+            step_r, step_rc = max(1, len(r) // 200), max(1, len(rc) // 200)
+            coarse = values[::step_rc, ::step_r]
+            if np.isfinite(coarse).sum() > 4 and np.nanmin(coarse) < np.nanmax(coarse):
+                artists['contours'] = ax.contour(r[::step_r], rc[::step_rc], coarse, levels=10,
+                                                 colors='k', linewidths=0.5)
+            artists['point'].set_data([self.model.r], [self.model.rc])
+            ax.set_title(f'{label.split(" (")[0]} over r x rc')
+            ax.set_xlim(*limits[0])
+            ax.set_ylim(*limits[1])
+        finally:
+            self.map_drawing = False
+        self.view.mapCanvas.draw_idle()
@@ -1,6 +1,87 @@
 # dieselModel.py
 
-import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+
+import numpy as np
+
+# fields of the structured arrays returned by DieselCycleModel.solve_batch
+RESULT_DTYPE = np.dtype([(name, float) for name in ('T2', 'P2', 'T3', 'P3', 'T4', 'P4', 'efficiency')])
+
+# elements of the results DieselCycleModel.solve_batch works on at a time
+_BLOCK = 8192
+
+def minmax_downsample(x, y, width, x_range=None):
+    """
+    Reduce a curve to what can be seen at a given pixel width.
+
+    The x range is split into width columns; in each column only the first, last, lowest and
+    highest points are kept (in their original order), so the drawn line looks the same as
+    the full curve. Works for curves that sweep x in either direction.
+
+    Args:
+        x (numpy.ndarray): x values (monotonic).
+        y (numpy.ndarray): y values.
+        width (int): Number of pixel columns.
+        x_range (tuple): (xmin, xmax) the columns span; defaults to the range of x.
+
+    Returns:
+        tuple: (x, y) of the kept points.
+    """
+    if len(x) <= 4 * width:
+        return x, y
+    xmin, xmax = x_range if x_range is not None else (x.min(), x.max())
+    column = np.clip(((x - xmin) / (xmax - xmin) * width).astype(int), 0, width - 1)
+    # --- Sort by column, then by y: the ends of each column group are its min and max ---
+    order = np.lexsort((y, column))
+    group_start = np.flatnonzero(np.diff(column[order], prepend=-1))
+    group_end = np.append(group_start[1:], len(order)) - 1
+    # --- The first and last point of each column keep the line continuous between columns ---
+    change = np.flatnonzero(np.diff(column)) + 1
+    keep = np.unique(np.concatenate((order[group_start], order[group_end], change, change - 1, [0, len(x) - 1])))
+    return x[keep], y[keep]
+
+
+@lru_cache(maxsize=32)
+def _pv_curves(r, rc, P1, k, n_points):
+    """
+    Cached body of DieselCycleModel.pv_curves (its arguments are the scalar inputs, so they hash).
+    """
+    V1 = 1.0                  # Reference volume (arbitrary units)
+    V2 = V1 / r
+    V3 = rc * V2
+    P2 = P1 * r ** k
+    # --- 1 -> 2 and 3 -> 4: isentropes P*V**k = const; 2 -> 3: isobar; 4 -> 1: isochore ---
+    V12 = np.linspace(V1, V2, n_points)
+    V23 = np.linspace(V2, V3, n_points)
+    V34 = np.linspace(V3, V1, n_points)
+    curves = {
+        '1-2': (V12, P1 * (V1 / V12) ** k),
+        '2-3': (V23, np.full(n_points, P2)),
+        '3-4': (V34, P2 * (V3 / V34) ** k),
+        '4-1': (np.array([V1, V1]), np.array([P2 * (V3 / V1) ** k, P1])),
+    }
+    for V, P in curves.values():
+        V.flags.writeable = False
+        P.flags.writeable = False
+    return curves
+
+
+@lru_cache(maxsize=32)
+def _pv_plot_data(r, rc, P1, k, n_points, width):
+    """
+    Cached body of DieselCycleModel.pv_plot_data.
+    """
+    curves = _pv_curves(r, rc, P1, k, n_points)
+    x_range = (1.0 / r, 1.0)
+    legs = [minmax_downsample(V, P, width, x_range) for V, P in curves.values()]
+    V = np.concatenate([leg[0] for leg in legs])
+    P = np.concatenate([leg[1] for leg in legs])
+    V.flags.writeable = False
+    P.flags.writeable = False
+    return V, P
+
 
 class DieselCycleModel:
     """
@@ -23,11 +104,14 @@ class DieselCycleModel:
         self.T1 = 300        # Initial temperature in Kelvin (default: 300K)
         self.P1 = 0.1        # Initial pressure in MPa (default: 0.1MPa)
         self.k = 1.4         # Specific heat ratio for air (default: 1.4)
+        self.n_points = 5000  # Points per process curve of the P-v diagram (see pv_curves)
 
     def solve(self):
         """
         Solve the Diesel cycle for all key thermodynamic states and efficiency.
 
+        Uses the same equations as solve_batch for the current attributes.
+
         Returns:
             dict: A dictionary containing temperatures, pressures, and efficiency:
                 - 'T2', 'P2': After isentropic compression
@@ -35,32 +119,251 @@ class DieselCycleModel:
                 - 'T4', 'P4': After isentropic expansion
                 - 'efficiency': Thermal efficiency of the cycle
         """
-        # --- Step 1: Isentropic compression from state 1 -> state 2 ---
-        T2 = self.T1 * self.r ** (self.k - 1)  # Temperature after compression
-        P2 = self.P1 * self.r ** self.k        # Pressure after compression
-
-        # --- Step 2: Constant pressure heat addition from state 2 -> state 3 ---
-        V2 = 1  # Assume V2 = 1 (arbitrary reference volume)
-        V3 = self.rc * V2  # V3 is rc times V2
-        T3 = T2 * self.rc  # Temperature increases with volume during heat addition
-        P3 = P2            # Pressure remains constant during heat addition
-
-        # --- Step 3: Isentropic expansion from state 3 -> state 4 ---
-        T4 = T3 * (V2 / V3) ** (self.k - 1)  # Temperature after expansion
-        P4 = P3 * (V2 / V3) ** self.k        # Pressure after expansion
-
-        # --- Diesel cycle thermal efficiency calculation ---
-        # Efficiency derived from Diesel cycle equations
-        efficiency = 1 - (1 / self.r ** (self.k - 1)) * ((self.rc ** self.k - 1) / (self.k * (self.rc - 1)))
-
-        # --- Bundle results into a dictionary and return ---
-        results = {
-            'T2': T2,
-            'P2': P2,
-            'T3': T3,
-            'P3': P3,
-            'T4': T4,
-            'P4': P4,
-            'efficiency': efficiency
-        }
+        results = self.solve_batch()
+        return {name: float(results[name]) for name in RESULT_DTYPE.names}
+
+    def solve_batch(self, r=None, rc=None, T1=None, P1=None, k=None):
+        """
+        Solve the Diesel cycle for arrays of inputs at once.
+
+        The inputs broadcast against each other like NumPy arrays (e.g. r[:, None] and rc[None, :] for a grid).
+        Any input left as None takes the value of the model attribute.
+
+        Args:
+            r (array_like): Compression ratio (V1/V2).
+            rc (array_like): Cutoff ratio (V3/V2).
+            T1 (array_like): Initial temperature at state 1 (K).
+            P1 (array_like): Initial pressure at state 1 (MPa).
+            k (array_like): Specific heat ratio (Cp/Cv).
+
+        Returns:
+            numpy.ndarray: Structured array in the broadcast shape of the inputs with the
+            fields of RESULT_DTYPE ('T2', 'P2', 'T3', 'P3', 'T4', 'P4', 'efficiency').
+        """
+        r, rc, T1, P1, k = [np.asarray(self_val if val is None else val, dtype=float)
+                            for val, self_val in zip((r, rc, T1, P1, k), (self.r, self.rc, self.T1, self.P1, self.k))]
+        shape = np.broadcast_shapes(r.shape, rc.shape, T1.shape, P1.shape, k.shape)
+        results = np.empty(shape, dtype=RESULT_DTYPE)
+
+        # --- Work a block of rows at a time, so the temporaries and the block of records stay in cache ---
+        # Each input keeps its own shape (padded to the dimensions of the results) and is only cut into
+        # blocks along the first axis if it varies there, so on a grid the powers and logs are taken on
+        # the small axis inputs, not on the broadcast plane.
+        ndim = max(len(shape), 1)
+        inputs = [x.reshape((1,) * (ndim - x.ndim) + x.shape) for x in (r, rc, T1, P1, k)]
+        out_all = results.reshape(shape or (1,))
+        rows = max(1, _BLOCK // max(1, int(np.prod(out_all.shape[1:]))))
+        for start in range(0, out_all.shape[0], rows):
+            block = slice(start, start + rows)
+            r_, rc_, T1_, P1_, k_ = [x[block] if x.shape[0] > 1 else x for x in inputs]
+            out = out_all[block]
+
+            r_k1 = np.exp((k_ - 1) * np.log(r_))  # r**(k-1)
+            ln_rc = np.log(rc_)
+            rc_k1 = np.expm1(k_ * ln_rc)  # rc**k - 1, accurate as rc -> 1
+            rc_k = rc_k1 + 1
+
+            # --- Step 1: Isentropic compression from state 1 -> state 2 (written straight into the records) ---
+            T2 = np.multiply(T1_, r_k1, out=out['T2'])  # T1*r**(k-1)
+            P2 = np.multiply(P1_ * r_, r_k1, out=out['P2'])  # P1*r**k
+
+            # --- Step 2: Constant pressure heat addition from state 2 -> state 3 (V3/V2 = rc) ---
+            np.multiply(T2, rc_, out=out['T3'])
+            out['P3'] = P2
+
+            # --- Step 3: Isentropic expansion from state 3 -> state 4 (V4 = V1, so V3/V4 = rc/r) ---
+            np.multiply(T1_, rc_k, out=out['T4'])  # T3*(rc/r)**(k-1) = T1*rc**k
+            np.multiply(P1_, rc_k, out=out['P4'])  # P3*(rc/r)**k = P1*rc**k
+
+            # --- Diesel cycle thermal efficiency: 1 - (rc**k - 1)/(k*(rc - 1))/r**(k-1) ---
+            # The cutoff factor is 0/0 at rc = 1 (no heat added, the Otto limit where it is 1).
+            # With expm1 on top and the exact rc - 1 below it keeps full precision as rc -> 1;
+            # very close to 1 it is taken from its series 1 + (k-1)/2*ln rc + (k-1)*(2k-1)/12*ln rc**2.
+            with np.errstate(invalid='ignore', divide='ignore'):
+                cutoff = rc_k1 / (k_ * (rc_ - 1))
+            near_one = np.abs(ln_rc) < 1e-6
+            if near_one.any():
+                series = 1 + (k_ - 1) / 2 * ln_rc * (1 + (2 * k_ - 1) / 6 * ln_rc)
+                cutoff = np.where(near_one, series, cutoff)
+            np.subtract(1, cutoff / r_k1, out=out['efficiency'])
         return results
+
+    def pv_curves(self, n_points=None):
+        """
+        Generate the four processes of the cycle as P-v curves (V1 = 1, arbitrary units).
+
+        1 -> 2 and 3 -> 4 are isentropes (P*V**k = const), 2 -> 3 is at constant pressure
+        and 4 -> 1 at constant volume. Results are cached for the inputs, so asking again
+        costs nothing.
+
+        Args:
+            n_points (int): Points per curve (defaults to self.n_points).
+
+        Returns:
+            dict: '1-2', '2-3', '3-4', '4-1' -> (V, P) read-only arrays, P in MPa.
+        """
+        n_points = self.n_points if n_points is None else n_points
+        return _pv_curves(float(self.r), float(self.rc), float(self.P1), float(self.k), int(n_points))
+
+    def pv_plot_data(self, width, n_points=None):
+        """
+        The closed P-v loop, reduced to what can be drawn at a pixel width (see minmax_downsample).
+
+        Args:
+            width (int): Width of the plot in pixels.
+            n_points (int): Points per curve before downsampling (defaults to self.n_points).
+
+        Returns:
+            tuple: (V, P) read-only arrays going 1 -> 2 -> 3 -> 4 -> 1.
+        """
+        n_points = self.n_points if n_points is None else n_points
+        return _pv_plot_data(float(self.r), float(self.rc), float(self.P1), float(self.k), int(n_points),
+                             max(int(width), 1))
+
+
+class DieselMapTiles:
+    """
+    Tiled, cached evaluation of a Diesel cycle model over the r x rc plane (for contour maps).
+
+    The plane is cut into square tiles of TILE x TILE cells on a grid of cell spacings
+    2**-level (one level per axis, so r and rc can be zoomed independently). A map of a
+    window evaluates only the tiles it overlaps that are not cached yet, so panning and
+    zooming reuse what has been evaluated before. Tiles are keyed by the model class and
+    (T1, P1, k), so changing those starts new tiles while the old ones age out of the
+    least recently used cache. Cells with r <= 1, rc < 1 or rc > r are not engines and
+    hold NaN.
+
+    Tiles may be evaluated from a worker thread; the cache is guarded by a lock.
+
+    Attributes:
+        model (DieselCycleModel): Model whose solve_batch evaluates the tiles.
+        max_tiles (int): Tiles kept in the cache (each holds FIELDS as float64).
+    """
+
+    TILE = 128
+    FIELDS = ('efficiency', 'T3', 'P3')
+
+    def __init__(self, model, max_tiles=256):
+        self.model = model
+        self.max_tiles = max_tiles
+        self._tiles = OrderedDict()
+        self._lock = threading.Lock()
+
+    def levels(self, r_range, rc_range, nx, ny):
+        """
+        Zoom levels whose cells are no wider than a pixel of an nx x ny map of the window.
+
+        Returns:
+            tuple: (level of r, level of rc)
+        """
+        return tuple(int(np.ceil(np.log2(max(n, 1) / max(hi - lo, 1e-12))))
+                     for (lo, hi), n in ((r_range, nx), (rc_range, ny)))
+
+    def tile_keys(self, r_range, rc_range, nx, ny, T1=None, P1=None, k=None):
+        """
+        Keys of the tiles a map of the window needs (see render).
+
+        Returns:
+            list: (model class name, T1, P1, k, level of r, level of rc, i, j) tuples.
+        """
+        inputs = self._inputs(T1, P1, k)
+        lr, lc = self.levels(r_range, rc_range, nx, ny)
+        (i0, i1), (j0, j1) = self._tile_span(r_range, lr), self._tile_span(rc_range, lc)
+        return [inputs + (lr, lc, i, j) for i in range(i0, i1 + 1) for j in range(j0, j1 + 1)]
+
+    def missing(self, keys):
+        """
+        The keys that are not in the cache yet.
+        """
+        with self._lock:
+            return [key for key in keys if key not in self._tiles]
+
+    def tile(self, key):
+        """
+        The fields of one tile, from the cache or evaluated now.
+
+        Args:
+            key (tuple): Tile key (see tile_keys).
+
+        Returns:
+            dict: FIELDS -> (TILE, TILE) read-only arrays indexed [r cell, rc cell].
+        """
+        with self._lock:
+            data = self._tiles.get(key)
+            if data is not None:
+                self._tiles.move_to_end(key)
+                return data
+        name, T1, P1, k, lr, lc, i, j = key
+        r = (i * self.TILE + np.arange(self.TILE) + 0.5) * 2.0 ** -lr
+        rc = (j * self.TILE + np.arange(self.TILE) + 0.5) * 2.0 ** -lc
+        results = self.model.solve_batch(r[:, None], rc[None, :], T1, P1, k)
+        valid = (r[:, None] > 1) & (rc[None, :] >= 1) & (rc[None, :] <= r[:, None])
+        data = {}
+        for field in self.FIELDS:
+            values = np.where(valid, results[field], np.nan)
+            values.flags.writeable = False
+            data[field] = values
+        with self._lock:
+            self._tiles[key] = data
+            while len(self._tiles) > self.max_tiles:
+                self._tiles.popitem(last=False)
+        return data
+
+    def render(self, r_range, rc_range, nx, ny, T1=None, P1=None, k=None, cancelled=None, progress=None):
+        """
+        Map the window at (at least) nx x ny cells from the tiles, evaluating the missing ones.
+
+        Args:
+            r_range (tuple): (lowest, highest) compression ratio of the window.
+            rc_range (tuple): (lowest, highest) cutoff ratio of the window.
+            nx (int): Cells wanted along r (e.g. the width of the plot in pixels).
+            ny (int): Cells wanted along rc.
+            T1, P1, k (float): Inputs held fixed over the map (default: the model attributes).
+            cancelled (callable): Returns True to stop early (render then returns None).
+            progress (callable): Called with (tiles done, tiles needed).
+
+        Returns:
+            tuple: (r cell centers, rc cell centers, dict of FIELDS -> arrays indexed [rc, r]), or None if cancelled.
+        """
+        keys = self.tile_keys(r_range, rc_range, nx, ny, T1, P1, k)
+        lr, lc = keys[0][4:6]
+        i0, j0 = keys[0][6:]
+        i1, j1 = keys[-1][6:]
+        n_i, n_j = i1 - i0 + 1, j1 - j0 + 1
+        mosaic = {field: np.empty((n_j * self.TILE, n_i * self.TILE)) for field in self.FIELDS}
+        for done, key in enumerate(keys):
+            if cancelled is not None and cancelled():
+                return None
+            data = self.tile(key)
+            i, j = key[6:]
+            rows = slice((j - j0) * self.TILE, (j - j0 + 1) * self.TILE)
+            cols = slice((i - i0) * self.TILE, (i - i0 + 1) * self.TILE)
+            for field in self.FIELDS:
+                mosaic[field][rows, cols] = data[field].T
+            if progress is not None:
+                progress(done + 1, len(keys))
+
+        # --- Crop the mosaic to the cells inside the window ---
+        r = ((i0 * self.TILE + np.arange(n_i * self.TILE)) + 0.5) * 2.0 ** -lr
+        rc = ((j0 * self.TILE + np.arange(n_j * self.TILE)) + 0.5) * 2.0 ** -lc
+        cols = slice(*np.searchsorted(r, r_range))
+        rows = slice(*np.searchsorted(rc, rc_range))
+        return r[cols], rc[rows], {field: values[rows, cols] for field, values in mosaic.items()}
+
+    def clear(self):
+        """
+        Drop every cached tile.
+        """
+        with self._lock:
+            self._tiles.clear()
+
+    def _inputs(self, T1, P1, k):
+        model = self.model
+        return (type(model).__name__,
+                float(model.T1 if T1 is None else T1),
+                float(model.P1 if P1 is None else P1),
+                float(model.k if k is None else k))
+
+    def _tile_span(self, value_range, level):
+        width = self.TILE * 2.0 ** -level
+        return int(np.floor(value_range[0] / width)), int(np.floor(value_range[1] / width))
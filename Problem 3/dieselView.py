@@ -2,6 +2,7 @@
 
 from PyQt5 import QtWidgets, QtCore
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+from matplotlib.backends.backend_qt5agg import NavigationToolbar2QT as NavigationToolbar
 import matplotlib.pyplot as plt
 
 class DieselCycleView(QtWidgets.QWidget):
@@ -9,7 +10,8 @@ class DieselCycleView(QtWidgets.QWidget):
     View class for the Diesel Cycle Simulator GUI.
 
     Manages the layout, input fields, output fields, calculation button,
-    and embeds a Matplotlib canvas for plotting the P-v diagram.
+    and embeds Matplotlib canvases for plotting the P-v diagram and, next to it,
+    a map of efficiency, T3 or P3 over the r x rc plane (pan and zoom with its toolbar).
     """
 
     def __init__(self):
@@ -26,13 +28,15 @@ class DieselCycleView(QtWidgets.QWidget):
         """
         # --- Window Settings ---
         self.setWindowTitle('Diesel Cycle Simulator')
-        self.setGeometry(100, 100, 1000, 700)
+        self.setGeometry(100, 100, 1400, 800)
 
         # --- Layouts ---
         mainLayout = QtWidgets.QVBoxLayout(self)     # Main vertical layout
         inputLayout = QtWidgets.QFormLayout()         # Form layout for input fields
         buttonLayout = QtWidgets.QHBoxLayout()        # Horizontal layout for buttons
         outputLayout = QtWidgets.QFormLayout()        # Form layout for output fields
+        plotLayout = QtWidgets.QHBoxLayout()          # P-v diagram and map side by side
+        mapLayout = QtWidgets.QVBoxLayout()           # Map controls, toolbar and canvas
 
         # --- Input Fields ---
         self.r_input = QtWidgets.QLineEdit('18')      # Compression ratio input
@@ -81,8 +85,26 @@ class DieselCycleView(QtWidgets.QWidget):
         self.figure, self.ax = plt.subplots()        # Create a Matplotlib figure and axis
         self.canvas = FigureCanvas(self.figure)      # Embed the Matplotlib figure into Qt
 
+        # --- Map of the r x rc plane ---
+        self.mapField = QtWidgets.QComboBox()         # Quantity shown on the map
+        self.mapField.addItems(['Efficiency', 'T3', 'P3'])
+        self.mapStatus = QtWidgets.QLabel()           # Tiles evaluated while the map is computing
+        self.mapFigure, self.mapAx = plt.subplots()
+        self.mapCanvas = FigureCanvas(self.mapFigure)
+        self.mapToolbar = NavigationToolbar(self.mapCanvas, self)
+        mapControls = QtWidgets.QHBoxLayout()
+        mapControls.addWidget(QtWidgets.QLabel('Map:'))
+        mapControls.addWidget(self.mapField)
+        mapControls.addWidget(self.mapStatus)
+        mapControls.addStretch()
+        mapLayout.addLayout(mapControls)
+        mapLayout.addWidget(self.mapToolbar)
+        mapLayout.addWidget(self.mapCanvas)
+        plotLayout.addWidget(self.canvas)
+        plotLayout.addLayout(mapLayout)
+
         # --- Assemble the Layouts ---
         mainLayout.addLayout(inputLayout)             # Add input layout
         mainLayout.addLayout(buttonLayout)            # Add button layout
         mainLayout.addLayout(outputLayout)            # Add output layout
-        mainLayout.addWidget(self.canvas)             # Add plotting canvas at the bottom
+        mainLayout.addLayout(plotLayout)              # Add plotting canvases at the bottom